@@ -0,0 +1,90 @@
+import csv
+import json
+
+from rest_framework.renderers import BaseRenderer, JSONRenderer
+
+SHOPPING_CART_HEADER = (
+    'Ингредиент',
+    'Единица измерения',
+    'Количество',
+)
+
+
+class EchoBuffer:
+    """Буфер, возвращающий записанную строку вместо ее хранения."""
+
+    def write(self, value):
+        return value
+
+
+class ShoppingCartTextRenderer(BaseRenderer):
+    """Рендерер списка покупок в формате TXT."""
+
+    media_type = 'text/plain'
+    format = 'txt'
+    charset = 'utf-8'
+
+    def render(self, data, accepted_media_type=None, renderer_context=None):
+        """Возвращает ответ об ошибке в виде текста."""
+        return ''.join(
+            f'{key}: {value}\n' for key, value in dict(data or {}).items()
+        ).encode(self.charset)
+
+    def stream(self, ingredients):
+        """Построчно генерирует список покупок."""
+        yield 'Список ингредиентов для покупки:\n'
+        for ingredient in ingredients:
+            yield (
+                f'{ingredient["ingredient__name"]} '
+                f'({ingredient["ingredient__measurement_unit"]}) - '
+                f'{ingredient["amount"]}\n'
+            )
+
+
+class ShoppingCartCSVRenderer(BaseRenderer):
+    """Рендерер списка покупок в формате CSV."""
+
+    media_type = 'text/csv'
+    format = 'csv'
+    charset = 'utf-8'
+
+    def render(self, data, accepted_media_type=None, renderer_context=None):
+        """Возвращает ответ об ошибке в виде строк CSV."""
+        return ''.join(
+            csv.writer(EchoBuffer()).writerow(row)
+            for row in dict(data or {}).items()
+        ).encode(self.charset)
+
+    def stream(self, ingredients):
+        """Построчно генерирует список покупок."""
+        writer = csv.writer(EchoBuffer())
+        yield writer.writerow(SHOPPING_CART_HEADER)
+        for ingredient in ingredients:
+            yield writer.writerow((
+                ingredient['ingredient__name'],
+                ingredient['ingredient__measurement_unit'],
+                ingredient['amount'],
+            ))
+
+
+class ShoppingCartJSONRenderer(JSONRenderer):
+    """Рендерер списка покупок в формате JSON."""
+
+    charset = 'utf-8'
+
+    def stream(self, ingredients):
+        """Поэлементно генерирует массив списка покупок."""
+        separator = '['
+        for ingredient in ingredients:
+            yield separator + json.dumps(
+                {
+                    'name': ingredient['ingredient__name'],
+                    'measurement_unit': (
+                        ingredient['ingredient__measurement_unit']
+                    ),
+                    'amount': ingredient['amount'],
+                },
+                ensure_ascii=False,
+            )
+            separator = ','
+        yield '[]' if separator == '[' else ']'
@@ -1,9 +1,26 @@
-from django.db import transaction
-from django.db.models import F
+from collections import Counter
+
+from django.db import IntegrityError, transaction
+from django.db.models import (
+    F,
+    Prefetch,
+    Window,
+    prefetch_related_objects,
+)
+from django.db.models.expressions import RawSQL
+from django.db.models.functions import RowNumber
 from drf_extra_fields.fields import Base64ImageField
 from rest_framework import serializers
 
-from core.consts import MAX_VALUE_VALIDATOR, MIN_VALUE_VALIDATOR
+from core.consts import (
+    IMAGE_RENDITIONS,
+    LIST_IMAGE_RENDITION,
+    MAX_BATCH_RECIPES,
+    MAX_VALUE_VALIDATOR,
+    MIN_VALUE_VALIDATOR,
+    SHORT_IMAGE_RENDITION,
+)
+from core.mixins import SerializationMetricsMixin
 from recipes.models import (
     Favorite,
     Ingredient,
@@ -15,7 +32,38 @@ from recipes.models import (
 from users.models import Follow, User
 
 
-class UserSerializer(serializers.ModelSerializer):
+class RecipeImageField(serializers.Field):
+    """Поле ссылок на копии картинки рецепта.
+
+    Без параметра rendition возвращает словарь ссылок на все копии.
+    """
+
+    def __init__(self, rendition=None, **kwargs):
+        self.rendition = rendition
+        kwargs['source'] = '*'
+        kwargs['read_only'] = True
+        super().__init__(**kwargs)
+
+    def get_url(self, recipe, rendition):
+        """Возвращает абсолютную ссылку на копию картинки."""
+        if not recipe.image:
+            return None
+        url = recipe.image.storage.url(recipe.get_image_rendition(rendition))
+        request = self.context.get('request')
+        if request is not None:
+            return request.build_absolute_uri(url)
+        return url
+
+    def to_representation(self, recipe):
+        if self.rendition is not None:
+            return self.get_url(recipe, self.rendition)
+        return {
+            rendition: self.get_url(recipe, rendition)
+            for rendition in IMAGE_RENDITIONS
+        }
+
+
+class UserSerializer(SerializationMetricsMixin, serializers.ModelSerializer):
     """Сериализатор модели пользователя."""
 
     is_subscribed = serializers.SerializerMethodField()
@@ -31,16 +79,29 @@ class UserSerializer(serializers.ModelSerializer):
             'is_subscribed',
         )
 
+    def get_following_ids(self):
+        """Возвращает id авторов, на которых подписан пользователь.
+
+        Множество загружается одним запросом и хранится в запросе,
+        поэтому все сериализаторы пользователей его переиспользуют.
+        """
+        request = self.context['request']
+        if not hasattr(request, 'following_ids'):
+            user = request.user
+            request.following_ids = set(
+                Follow.objects.filter(user=user).values_list(
+                    'following_id',
+                    flat=True,
+                )
+            ) if user.is_authenticated else set()
+        return request.following_ids
+
     def get_is_subscribed(self, obj):
         """Проверяет подписку на автора."""
-        user = self.context['request'].user
-        return (
-            user.is_authenticated
-            and obj.following.filter(user=user).exists()
-        )
+        return obj.id in self.get_following_ids()
 
 
-class TagSerializer(serializers.ModelSerializer):
+class TagSerializer(SerializationMetricsMixin, serializers.ModelSerializer):
     """Сериализатор модели тега."""
 
     class Meta:
@@ -59,7 +120,9 @@ class TagSerializer(serializers.ModelSerializer):
         )
 
 
-class IngredientSerializer(serializers.ModelSerializer):
+class IngredientSerializer(
+    SerializationMetricsMixin, serializers.ModelSerializer
+):
     """Сериализатор модели ингредиента."""
 
     class Meta:
@@ -79,9 +142,7 @@ class IngredientSerializer(serializers.ModelSerializer):
 class RecipeIngredientSerializer(serializers.ModelSerializer):
     """Сериализатор для записи ингредиента и количества в рецепт."""
 
-    id = serializers.PrimaryKeyRelatedField(
-        queryset=Ingredient.objects.all()
-    )
+    id = serializers.IntegerField()
     amount = serializers.IntegerField(
         min_value=MIN_VALUE_VALIDATOR,
         max_value=MAX_VALUE_VALIDATOR,
@@ -99,14 +160,38 @@ class RecipeIngredientSerializer(serializers.ModelSerializer):
         )
 
 
-class RecipeWriteSerializer(serializers.ModelSerializer):
+class RecipeIngredientReadSerializer(serializers.ModelSerializer):
+    """Сериализатор для получения ингредиента рецепта с количеством."""
+
+    id = serializers.ReadOnlyField(source='ingredient.id')
+    name = serializers.ReadOnlyField(source='ingredient.name')
+    measurement_unit = serializers.ReadOnlyField(
+        source='ingredient.measurement_unit'
+    )
+
+    class Meta:
+        model = RecipeIngredient
+        fields = (
+            'id',
+            'name',
+            'measurement_unit',
+            'amount',
+        )
+        read_only_fields = (
+            'id',
+            'name',
+            'measurement_unit',
+            'amount',
+        )
+
+
+class RecipeWriteSerializer(
+    SerializationMetricsMixin, serializers.ModelSerializer
+):
     """Сериализатор для создания рецепта."""
 
     ingredients = RecipeIngredientSerializer(many=True)
-    tags = serializers.PrimaryKeyRelatedField(
-        queryset=Tag.objects.all(),
-        many=True,
-    )
+    tags = serializers.ListField(child=serializers.IntegerField())
     image = Base64ImageField(
         allow_null=False,
         allow_empty_file=False,
@@ -131,13 +216,48 @@ class RecipeWriteSerializer(serializers.ModelSerializer):
             'cooking_time',
         )
 
+    @staticmethod
+    def get_ids_errors(model, ids):
+        """Проверяет id одним запросом и возвращает список ошибок."""
+        errors = []
+        missing = sorted(set(ids) - model.objects.in_bulk(set(ids)).keys())
+        if missing:
+            errors.append(
+                f'Не найдены {model._meta.verbose_name_plural.lower()} '
+                f'с id: {", ".join(map(str, missing))}.'
+            )
+        duplicates = sorted(
+            pk for pk, count in Counter(ids).items() if count > 1
+        )
+        if duplicates:
+            errors.append(
+                f'Повторяются {model._meta.verbose_name_plural.lower()} '
+                f'с id: {", ".join(map(str, duplicates))}.'
+            )
+        return errors
+
+    def validate(self, data):
+        """Проверяет все id ингредиентов и тегов рецепта."""
+        errors = {}
+        if 'ingredients' in data:
+            errors['ingredients'] = self.get_ids_errors(
+                Ingredient,
+                [ingredient['id'] for ingredient in data['ingredients']],
+            )
+        if 'tags' in data:
+            errors['tags'] = self.get_ids_errors(Tag, data['tags'])
+        errors = {field: error for field, error in errors.items() if error}
+        if errors:
+            raise serializers.ValidationError(errors)
+        return data
+
     @staticmethod
     def create_ingredients(recipe, ingredients):
         """Создает список ингредиентов рецепта."""
         RecipeIngredient.objects.bulk_create([
             RecipeIngredient(
                 recipe=recipe,
-                ingredient=ingredient['id'],
+                ingredient_id=ingredient['id'],
                 amount=ingredient['amount'],
             )
             for ingredient in ingredients
@@ -157,32 +277,87 @@ class RecipeWriteSerializer(serializers.ModelSerializer):
         recipe.save()
         return recipe
 
+    @staticmethod
+    def update_ingredients(recipe, ingredients):
+        """Изменяет только отличающиеся ингредиенты рецепта."""
+        current = {
+            recipe_ingredient.ingredient_id: recipe_ingredient
+            for recipe_ingredient in recipe.recipe_ingredient.all()
+        }
+        amounts = {
+            ingredient['id']: ingredient['amount']
+            for ingredient in ingredients
+        }
+        removed = current.keys() - amounts.keys()
+        if removed:
+            RecipeIngredient.objects.filter(
+                recipe=recipe,
+                ingredient_id__in=removed,
+            ).delete()
+        RecipeIngredient.objects.bulk_create([
+            RecipeIngredient(
+                recipe=recipe,
+                ingredient_id=ingredient_id,
+                amount=amount,
+            )
+            for ingredient_id, amount in amounts.items()
+            if ingredient_id not in current
+        ])
+        changed = []
+        for ingredient_id, recipe_ingredient in current.items():
+            amount = amounts.get(ingredient_id, recipe_ingredient.amount)
+            if amount != recipe_ingredient.amount:
+                recipe_ingredient.amount = amount
+                changed.append(recipe_ingredient)
+        if changed:
+            RecipeIngredient.objects.bulk_update(changed, ('amount',))
+
     @transaction.atomic
     def update(self, instance, validated_data):
-        """Обновляет существующий рецепт."""
-        ingredients_data = validated_data.pop('ingredients')
-        tags_data = validated_data.pop('tags')
-        instance.tags.set(tags_data)
-        RecipeIngredient.objects.filter(recipe=instance).delete()
-        self.create_ingredients(instance, ingredients_data)
+        """Обновляет существующий рецепт.
+
+        Ингредиенты и теги изменяются, только если переданы в запросе.
+        """
+        ingredients_data = validated_data.pop('ingredients', None)
+        tags_data = validated_data.pop('tags', None)
+        if tags_data is not None:
+            instance.tags.set(tags_data)
+        if ingredients_data is not None:
+            self.update_ingredients(instance, ingredients_data)
         return super().update(instance, validated_data)
 
     def to_representation(self, instance):
         """Возвращает сериализованный экземпляр рецепта."""
+        prefetch_related_objects(
+            (instance,),
+            Prefetch(
+                'recipe_ingredient',
+                queryset=RecipeIngredient.objects.select_related(
+                    'ingredient'
+                ).order_by('ingredient__name'),
+            ),
+        )
         return RecipeReadSerializer(
             instance,
             context=self.context,
         ).data
 
 
-class RecipeReadSerializer(serializers.ModelSerializer):
+class RecipeReadSerializer(
+    SerializationMetricsMixin, serializers.ModelSerializer
+):
     """Сериализатор для получения рецепта."""
 
     tags = TagSerializer(many=True, read_only=True)
     author = UserSerializer(read_only=True)
-    ingredients = serializers.SerializerMethodField()
+    ingredients = RecipeIngredientReadSerializer(
+        source='recipe_ingredient',
+        many=True,
+        read_only=True,
+    )
     is_favorited = serializers.BooleanField(default=False)
     is_in_shopping_cart = serializers.BooleanField(default=False)
+    image_renditions = RecipeImageField()
 
     class Meta:
         model = Recipe
@@ -195,6 +370,7 @@ class RecipeReadSerializer(serializers.ModelSerializer):
             'is_in_shopping_cart',
             'name',
             'image',
+            'image_renditions',
             'text',
             'cooking_time',
         )
@@ -207,44 +383,67 @@ class RecipeReadSerializer(serializers.ModelSerializer):
             'is_in_shopping_cart',
             'name',
             'image',
+            'image_renditions',
             'text',
             'cooking_time',
         )
 
-    def get_ingredients(self, obj):
-        """Получает ингредиенты рецепта с полем amount."""
-        return obj.ingredients.values(
-            'id',
-            'name',
-            'measurement_unit',
-            amount=F('recipe_ingredient__amount'),
-        )
+    def to_representation(self, instance):
+        """В списке рецептов отдает ссылку на уменьшенную картинку."""
+        data = super().to_representation(instance)
+        view = self.context.get('view')
+        if view is not None and view.action in ('list', 'feed'):
+            data['image'] = data['image_renditions'][LIST_IMAGE_RENDITION]
+        return data
 
 
 class ShortRecipeInFollowSerializer(serializers.ModelSerializer):
     """Сериализатор для получения короткого рецепта в подписках."""
 
+    image = RecipeImageField(rendition=SHORT_IMAGE_RENDITION)
+    image_renditions = RecipeImageField()
+
     class Meta:
         model = Recipe
         fields = (
             'id',
             'name',
             'image',
+            'image_renditions',
             'cooking_time',
         )
         read_only_fields = (
             'id',
             'name',
             'image',
+            'image_renditions',
             'cooking_time',
         )
 
 
+class RecipeIdsSerializer(serializers.Serializer):
+    """Сериализатор списка id рецептов для пакетных операций."""
+
+    recipes = serializers.ListField(
+        child=serializers.IntegerField(),
+        allow_empty=False,
+        max_length=MAX_BATCH_RECIPES,
+        error_messages={
+            'max_length': (
+                'Максимальное количество рецептов {max_length}.'
+            ),
+        },
+    )
+
+    def validate_recipes(self, value):
+        """Убирает повторы id, сохраняя порядок."""
+        return list(dict.fromkeys(value))
+
+
 class SubscriptionsSerializer(UserSerializer):
     """Сериализатор подписок."""
 
     recipes = serializers.SerializerMethodField()
-    recipes_count = serializers.ReadOnlyField(source='recipes.count')
 
     class Meta:
         model = User
@@ -269,76 +468,115 @@ class SubscriptionsSerializer(UserSerializer):
             'recipes_count',
         )
 
-    def get_recipes(self, obj):
-        """Возвращает рецепты автора."""
+    @staticmethod
+    def get_recipes_limit(request):
+        """Возвращает лимит рецептов автора из параметров запроса."""
         try:
-            recipes_limit = int(
-                self.context['request'].query_params.get(
+            return int(
+                request.query_params.get(
                     'recipes_limit',
                     default=3,
                 )
             )
         except ValueError:
-            recipes_limit = None
-        recipes = obj.recipes.all()[:recipes_limit]
+            return None
+
+    @staticmethod
+    def prefetch_recipes(authors, recipes_limit):
+        """Загружает рецепты авторов с ограничением одним запросом."""
+        if not authors:
+            return
+        queryset = Recipe.objects.all()
+        if recipes_limit is not None:
+            ranked_sql, params = Recipe.objects.filter(
+                author__in=authors
+            ).annotate(
+                row_number=Window(
+                    expression=RowNumber(),
+                    partition_by=F('author'),
+                    order_by=(F('pub_date').desc(), F('id').desc()),
+                )
+            ).values('id', 'row_number').query.sql_with_params()
+            queryset = queryset.filter(id__in=RawSQL(
+                f'SELECT id FROM ({ranked_sql}) AS ranked '
+                'WHERE row_number <= %s',
+                (*params, recipes_limit),
+            ))
+        prefetch_related_objects(
+            authors,
+            Prefetch('recipes', queryset=queryset, to_attr='limited_recipes'),
+        )
+
+    def get_recipes(self, obj):
+        """Возвращает рецепты автора."""
         return ShortRecipeInFollowSerializer(
-            recipes,
+            obj.limited_recipes,
             many=True,
             context=self.context,
         ).data
 
 
-class SubscribeSerializer(serializers.ModelSerializer):
+class SubscribeSerializer(
+    SerializationMetricsMixin, serializers.ModelSerializer
+):
     """Сериализатор подписки на пользователя."""
 
+    user = serializers.HiddenField(default=serializers.CurrentUserDefault())
+
     class Meta:
         model = Follow
         fields = ('user', 'following')
 
     def validate(self, data):
         """Проверяет подписку на самого себя."""
-        user = self.context['request'].user
-        following_user = data['following']
-        if user == following_user:
+        if data['user'] == data['following']:
             raise serializers.ValidationError(
                 'Нельзя подписаться на самого себя.'
             )
-        if user.following.filter(
-            user=user,
-            following=following_user
-        ).exists():
+        return data
+
+    def create(self, validated_data):
+        """Создает подписку, повторная подписка отклоняется базой."""
+        try:
+            with transaction.atomic():
+                return super().create(validated_data)
+        except IntegrityError:
             raise serializers.ValidationError(
                 'Вы уже подписаны на этого пользователя.'
             )
-        return data
 
     def to_representation(self, instance):
         """Возвращает сериализованный экземпляр подписки."""
+        SubscriptionsSerializer.prefetch_recipes(
+            (instance.following,),
+            SubscriptionsSerializer.get_recipes_limit(self.context['request']),
+        )
         return SubscriptionsSerializer(
             instance.following,
             context=self.context,
         ).data
 
 
-class FavoriteShoppingCartSerializer(serializers.ModelSerializer):
+class FavoriteShoppingCartSerializer(
+    SerializationMetricsMixin, serializers.ModelSerializer
+):
     """Сериализатор для получения рецепта в избранном или корзине."""
 
+    user = serializers.HiddenField(default=serializers.CurrentUserDefault())
+
     class Meta:
         abstract = True
         fields = ('user', 'recipe',)
 
-    def validate(self, data):
-        """Проверяет рецепт в избранном и корзине."""
-        user = self.context['request'].user
-        recipe = data['recipe']
-        if self.Meta.model.objects.filter(
-            user=user,
-            recipe=recipe
-        ).exists():
+    def create(self, validated_data):
+        """Добавляет рецепт, повторное добавление отклоняется базой."""
+        try:
+            with transaction.atomic():
+                return super().create(validated_data)
+        except IntegrityError:
             raise serializers.ValidationError(
                 f'Рецепт уже добавлен в {self.Meta.model._meta.verbose_name}!'
             )
-        return data
 
     def to_representation(self, instance):
         """Возвращает сериализованный экземпляр рецепта."""
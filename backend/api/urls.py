@@ -1,7 +1,14 @@
 from django.urls import include, path, re_path
 from rest_framework.routers import DefaultRouter
 
-from api.views import IngredientViewSet, RecipeViewSet, TagViewSet, UserViewSet
+from api.views import (
+    IngredientViewSet,
+    RecipeViewSet,
+    TagViewSet,
+    UserViewSet,
+    metrics,
+)
+from core.async_views import get_async_urls
 
 app_name = 'api'
 
@@ -13,6 +20,7 @@ router.register('ingredients', IngredientViewSet, 'ingredients')
 router.register('recipes', RecipeViewSet, 'recipes')
 
 urlpatterns = [
-    path('', include(router.urls)),
+    path('metrics', metrics, name='metrics'),
+    path('', include(get_async_urls(router.urls))),
     re_path(r'^auth/', include('djoser.urls.authtoken')),
 ]
@@ -1,15 +1,25 @@
-from django.db.models import Exists, OuterRef, Sum
-from django.http import FileResponse
+from functools import partial
+
+from django.db import transaction
+from django.db.models import Exists, OuterRef, Prefetch, Sum
+from django.http import HttpResponse, StreamingHttpResponse
 from djoser.views import UserViewSet as DjoserUserViewSet
+from prometheus_client import CONTENT_TYPE_LATEST
 from django_filters import rest_framework as filters
 from rest_framework import permissions, status, viewsets
 from rest_framework.decorators import action
 from rest_framework.response import Response
 
+from api.renderers import (
+    ShoppingCartCSVRenderer,
+    ShoppingCartJSONRenderer,
+    ShoppingCartTextRenderer,
+)
 from api.serializers import (
     FavoriteSerializer,
     ShoppingCartSerializer,
     IngredientSerializer,
+    RecipeIdsSerializer,
     RecipeReadSerializer,
     RecipeWriteSerializer,
     SubscribeSerializer,
@@ -18,7 +28,18 @@ from api.serializers import (
     TagSerializer,
 )
 from core.filters import IngredientFilter, RecipeFilter
+from core.caches import (
+    CATALOG_VERSION_KEY,
+    RECIPES_VERSION_KEY,
+    get_recipe_version_key,
+    get_user_version_key,
+)
+from core.counters import change_counter
+from core.mixins import AnonymousCacheMixin, CatalogCacheMixin
+from core.metrics import get_metrics
+from core.paginators import FeedPagination
 from core.permissions import IsAuthorOrReadOnly
+from recipes.feed import get_feed_page
 from recipes.models import (
     Favorite,
     Ingredient,
@@ -27,6 +48,8 @@ from recipes.models import (
     ShoppingCart,
     Tag,
 )
+from recipes.sections import delete_section_recipes, insert_section_recipes
+from recipes.signals import RECIPE_COUNTERS, skip_recipe_counters
 from users.models import Follow, User
 
 
@@ -36,6 +59,7 @@ class UserViewSet(DjoserUserViewSet):
     serializer_class = UserSerializer
     queryset = User.objects.all()
     http_method_names = ('get', 'post', 'delete')
+    cursor_ordering = ('username',)
 
     def get_permissions(self):
         """Распределение прав на действия."""
@@ -49,6 +73,10 @@ class UserViewSet(DjoserUserViewSet):
         user = self.request.user
         user_following = User.objects.filter(following__user=user)
         page = self.paginate_queryset(user_following)
+        SubscriptionsSerializer.prefetch_recipes(
+            page,
+            SubscriptionsSerializer.get_recipes_limit(request),
+        )
         serializer = SubscriptionsSerializer(
             page,
             context={'request': request},
@@ -59,12 +87,8 @@ class UserViewSet(DjoserUserViewSet):
     @action(detail=True, methods=('post',))
     def subscribe(self, request, id):
         """Подписка на пользователя."""
-        data = {
-            'user': request.user.id,
-            'following': id
-        }
         serializer = SubscribeSerializer(
-            data=data,
+            data={'following': id},
             context={'request': request},
         )
         serializer.is_valid(raise_exception=True)
@@ -74,15 +98,16 @@ class UserViewSet(DjoserUserViewSet):
     @subscribe.mapping.delete
     def unsubscribe(self, request, id):
         """Отписка от пользователя."""
-        user = request.user
-        subscribe_instance = Follow.objects.filter(user=user, following=id)
-        if subscribe_instance.exists():
-            subscribe_instance.delete()
+        deleted, _ = Follow.objects.filter(
+            user=request.user,
+            following=id,
+        ).delete()
+        if deleted:
             return Response(status=status.HTTP_204_NO_CONTENT)
         return Response(status=status.HTTP_400_BAD_REQUEST)
 
 
-class TagViewSet(viewsets.ReadOnlyModelViewSet):
+class TagViewSet(CatalogCacheMixin, viewsets.ReadOnlyModelViewSet):
     """Вьюсет для работы с тегами."""
 
     http_method_names = ('get',)
@@ -91,7 +116,7 @@ class TagViewSet(viewsets.ReadOnlyModelViewSet):
     pagination_class = None
 
 
-class IngredientViewSet(viewsets.ReadOnlyModelViewSet):
+class IngredientViewSet(CatalogCacheMixin, viewsets.ReadOnlyModelViewSet):
     """Вьюсет для работы с ингредиентами."""
 
     http_method_names = ('get',)
@@ -101,8 +126,14 @@ class IngredientViewSet(viewsets.ReadOnlyModelViewSet):
     filter_backends = (filters.DjangoFilterBackend,)
     filterset_class = IngredientFilter
 
+    def filter_queryset(self, queryset):
+        """Поиск и ограничение количества применяются только к списку."""
+        if self.action != 'list':
+            return queryset
+        return super().filter_queryset(queryset)
+
 
-class RecipeViewSet(viewsets.ModelViewSet):
+class RecipeViewSet(AnonymousCacheMixin, viewsets.ModelViewSet):
     """Вьюсет для работы с рецептами."""
 
     http_method_names = ('get', 'post', 'patch', 'delete')
@@ -110,6 +141,8 @@ class RecipeViewSet(viewsets.ModelViewSet):
     serializer_class = RecipeWriteSerializer
     filter_backends = (filters.DjangoFilterBackend,)
     filterset_class = RecipeFilter
+    cache_version_keys = (CATALOG_VERSION_KEY, RECIPES_VERSION_KEY)
+    cursor_ordering = ('-pub_date', '-id')
 
     def get_serializer_class(self):
         """Определяет класс сериализатора в зависимости от типа запроса."""
@@ -122,18 +155,33 @@ class RecipeViewSet(viewsets.ModelViewSet):
         if self.action in (
             'favorite',
             'shopping_cart',
+            'favorite_batch',
+            'shopping_cart_batch',
             'download_shopping_cart',
+            'feed',
         ):
             return (permissions.IsAuthenticated(),)
         return (IsAuthorOrReadOnly(),)
 
+    def get_cache_dependencies(self, data):
+        """Возвращает ключи версий рецептов и их авторов."""
+        recipes = data['results'] if self.action == 'list' else (data,)
+        for recipe in recipes:
+            yield get_recipe_version_key(recipe['id'])
+            yield get_user_version_key(recipe['author']['id'])
+
     def get_queryset(self):
         """Возвращает подзапросы к рецептам."""
         user = self.request.user
         queryset = Recipe.objects.select_related(
             'author'
         ).prefetch_related(
-            'ingredients',
+            Prefetch(
+                'recipe_ingredient',
+                queryset=RecipeIngredient.objects.select_related(
+                    'ingredient'
+                ).order_by('ingredient__name'),
+            ),
             'tags'
         )
         if user.is_anonymous:
@@ -153,14 +201,19 @@ class RecipeViewSet(viewsets.ModelViewSet):
             )
         )
 
+    def perform_destroy(self, instance):
+        """Удаляет рецепт вместе с избранным и списками покупок.
+
+        Счетчики удаляемого рецепта по каждой записи не обновляются.
+        """
+        with skip_recipe_counters((instance.pk,)):
+            instance.delete()
+
     @staticmethod
     def add_to_section(serializer, pk, request):
         """Статический метод добавления рецепта в раздел."""
         serializer_instance = serializer(
-            data={
-                'user': request.user.id,
-                'recipe': pk
-            },
+            data={'recipe': pk},
             context={
                 'request': request
             },
@@ -175,12 +228,11 @@ class RecipeViewSet(viewsets.ModelViewSet):
     @staticmethod
     def remove_from_section(model, pk, request):
         """Статический метод удаления рецепта из раздела."""
-        queryset = model.objects.filter(
+        deleted, _ = model.objects.filter(
             user=request.user,
             recipe=pk,
-        )
-        if queryset.exists():
-            queryset.delete()
+        ).delete()
+        if deleted:
             return Response(status=status.HTTP_204_NO_CONTENT)
         return Response(status=status.HTTP_400_BAD_REQUEST)
 
@@ -213,21 +265,113 @@ class RecipeViewSet(viewsets.ModelViewSet):
         return self.remove_from_section(ShoppingCart, pk, request)
 
     @staticmethod
-    def generate_ingredient_list(ingredients):
-        """Генерирует список с ингредиентами из строк."""
-        lines = ['Список ингредиентов для покупки:\n']
-        for ingredient in ingredients:
-            lines.append(
-                f'{ingredient["ingredient__name"]} '
-                f'({ingredient["ingredient__measurement_unit"]}) - '
-                f'{ingredient["amount"]}\n'
+    def add_batch_to_section(model, request):
+        """Добавляет список рецептов в раздел одним запросом INSERT.
+
+        Возвращает результат для каждого id: added, exists или not_found.
+        Статусы и счетчики считаются по строкам, которые вставила база.
+        """
+        serializer = RecipeIdsSerializer(data=request.data)
+        serializer.is_valid(raise_exception=True)
+        ids = serializer.validated_data['recipes']
+        found = set(
+            Recipe.objects.filter(id__in=ids).order_by().values_list(
+                'id', flat=True
+            )
+        )
+        with transaction.atomic():
+            added = insert_section_recipes(
+                model, request.user.pk, [pk for pk in ids if pk in found]
             )
-        content = ''.join(lines)
-        return content
+            change_counter(Recipe, RECIPE_COUNTERS[model], 1, pk__in=added)
+        return Response({'results': [
+            {
+                'id': pk,
+                'status': (
+                    'not_found' if pk not in found
+                    else 'added' if pk in added else 'exists'
+                ),
+            }
+            for pk in ids
+        ]})
 
-    @action(detail=False, methods=('get',))
-    def download_shopping_cart(self, request):
-        """Отдает пользователю список для покупок в виде TXT файла."""
+    @staticmethod
+    def remove_batch_from_section(model, request):
+        """Удаляет список рецептов из раздела одним запросом DELETE.
+
+        Возвращает результат для каждого id: removed или not_found.
+        Статусы и счетчики считаются по строкам, которые удалила база.
+        """
+        serializer = RecipeIdsSerializer(data=request.data)
+        serializer.is_valid(raise_exception=True)
+        ids = serializer.validated_data['recipes']
+        with transaction.atomic():
+            removed = delete_section_recipes(model, request.user.pk, ids)
+            change_counter(
+                Recipe, RECIPE_COUNTERS[model], -1, pk__in=removed
+            )
+        return Response({'results': [
+            {'id': pk, 'status': 'removed' if pk in removed else 'not_found'}
+            for pk in ids
+        ]})
+
+    @action(detail=False, methods=('post',), url_path='favorite/batch')
+    def favorite_batch(self, request):
+        """Добавление списка рецептов в раздел избранное."""
+        return self.add_batch_to_section(Favorite, request)
+
+    @favorite_batch.mapping.delete
+    def destroy_favorite_batch(self, request):
+        """Удаление списка рецептов из раздела избранное."""
+        return self.remove_batch_from_section(Favorite, request)
+
+    @action(detail=False, methods=('post',), url_path='shopping_cart/batch')
+    def shopping_cart_batch(self, request):
+        """Добавление списка рецептов в раздел список покупок."""
+        return self.add_batch_to_section(ShoppingCart, request)
+
+    @shopping_cart_batch.mapping.delete
+    def destroy_shopping_cart_batch(self, request):
+        """Удаление списка рецептов из раздела список покупок."""
+        return self.remove_batch_from_section(ShoppingCart, request)
+
+    @action(
+        detail=False,
+        methods=('get',),
+        pagination_class=FeedPagination,
+    )
+    def feed(self, request):
+        """Лента новых рецептов авторов из подписок.
+
+        Страница выбирается по записям ленты, рецепты загружаются
+        только для ее id.
+        """
+        ids = self.paginator.paginate_feed(request, partial(
+            get_feed_page,
+            request.user,
+            tags=request.query_params.getlist('tags'),
+        ))
+        recipes = self.get_queryset().in_bulk(ids)
+        serializer = self.get_serializer(
+            [recipes[pk] for pk in ids if pk in recipes], many=True
+        )
+        return self.get_paginated_response(serializer.data)
+
+    @action(
+        detail=False,
+        methods=('get',),
+        renderer_classes=(
+            ShoppingCartTextRenderer,
+            ShoppingCartCSVRenderer,
+            ShoppingCartJSONRenderer,
+        ),
+    )
+    def download_shopping_cart(self, request, **kwargs):
+        """Отдает пользователю список для покупок в виде файла.
+
+        Формат (TXT, CSV или JSON) выбирается по заголовку Accept
+        или параметру format, строки выгружаются курсором потоком.
+        """
         ingredients = RecipeIngredient.objects.filter(
             recipe__shoppingcart__user=request.user
         ).values(
@@ -236,8 +380,17 @@ class RecipeViewSet(viewsets.ModelViewSet):
         ).annotate(
             amount=Sum('amount')
         ).order_by('ingredient__name')
-        content = self.generate_ingredient_list(ingredients)
-        return FileResponse(
-            content, content_type='text/plain',
-            filename="Shopping_cart.txt"
+        renderer = request.accepted_renderer
+        response = StreamingHttpResponse(
+            renderer.stream(ingredients.iterator()),
+            content_type=f'{renderer.media_type}; charset={renderer.charset}',
+        )
+        response['Content-Disposition'] = (
+            f'attachment; filename="Shopping_cart.{renderer.format}"'
         )
+        return response
+
+
+def metrics(request):
+    """Отдает метрики запросов в текстовом формате Prometheus."""
+    return HttpResponse(get_metrics(), content_type=CONTENT_TYPE_LATEST)
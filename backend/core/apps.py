@@ -7,3 +7,7 @@ class CoreConfig(AppConfig):
     default_auto_field = 'django.db.models.BigAutoField'
     name = 'core'
     verbose_name = 'Ядро'
+
+    def ready(self):
+        """Подключает обработчики сигналов метрик."""
+        from core import signals  # noqa: F401
@@ -0,0 +1,70 @@
+from functools import wraps
+
+from asgiref.sync import sync_to_async
+from django.conf import settings
+from django.db import close_old_connections
+from django.urls import URLPattern
+
+from core.consts import ASYNC_ACTIONS
+
+
+def run_view(view, request, *args, **kwargs):
+    """Выполняет синхронное представление и вычитывает потоковый ответ.
+
+    Django 3.2 перебирает потоковый ответ в цикле событий, где запросы
+    к базе запрещены, поэтому содержимое читается в потоке представления.
+    """
+    response = view(request, *args, **kwargs)
+    if response.streaming:
+        response.streaming_content = list(response.streaming_content)
+    return response
+
+
+def run_read_view(view, request, *args, **kwargs):
+    """Выполняет действие чтения в потоке из пула.
+
+    Сигналы начала и конца запроса приходят в общий поток, поэтому
+    устаревшие соединения потока из пула закрываются здесь.
+    """
+    close_old_connections()
+    try:
+        return run_view(view, request, *args, **kwargs)
+    finally:
+        close_old_connections()
+
+
+def async_view(view):
+    """Возвращает асинхронную версию представления вьюсета.
+
+    Действия чтения из ASYNC_ACTIONS выполняются параллельно в пуле
+    потоков, остальные - в общем потоке, как синхронные представления
+    Django под ASGI.
+    """
+    read_view = sync_to_async(run_read_view, thread_sensitive=False)
+    write_view = sync_to_async(run_view, thread_sensitive=True)
+
+    @wraps(view)
+    async def wrapper(request, *args, **kwargs):
+        method = request.method.lower()
+        if method == 'head':
+            method = 'get'
+        if view.actions.get(method) in ASYNC_ACTIONS:
+            return await read_view(view, request, *args, **kwargs)
+        return await write_view(view, request, *args, **kwargs)
+
+    return wrapper
+
+
+def get_async_urls(urlpatterns):
+    """Заменяет представления вьюсетов асинхронными в режиме ASGI."""
+    if not settings.ASYNC_READ_VIEWS:
+        return urlpatterns
+    return [
+        URLPattern(
+            pattern.pattern,
+            async_view(pattern.callback),
+            pattern.default_args,
+            pattern.name,
+        ) if getattr(pattern.callback, 'actions', None) else pattern
+        for pattern in urlpatterns
+    ]
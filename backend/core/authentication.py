@@ -0,0 +1,43 @@
+from django.core.cache import cache
+from django.db import transaction
+from rest_framework.authentication import TokenAuthentication
+
+from core.caches import get_token_cache_key, get_user_token_cache_key
+from core.consts import TOKEN_CACHE_TIMEOUT
+
+
+class CachedTokenAuthentication(TokenAuthentication):
+    """Авторизация по токену с кешированием токена и пользователя.
+
+    Токен вместе с пользователем хранится в кеше TOKEN_CACHE_TIMEOUT
+    секунд, поэтому авторизованные запросы не обращаются к базе.
+    Счетчики такого пользователя могут быть устаревшими, но при его
+    сохранении не записываются, см. CounterFieldsModel.
+    """
+
+    def authenticate_credentials(self, key):
+        cache_key = get_token_cache_key(key)
+        token = cache.get(cache_key)
+        if token is None:
+            user, token = super().authenticate_credentials(key)
+            cache.set_many({
+                cache_key: token,
+                get_user_token_cache_key(user.pk): key,
+            }, TOKEN_CACHE_TIMEOUT)
+        return token.user, token
+
+
+def clear_token_cache(user_id, key=None):
+    """Удаляет токен пользователя из кеша после фиксации транзакции.
+
+    Без key ключ токена берется из кеша пользователя.
+    """
+    def clear():
+        user_key = get_user_token_cache_key(user_id)
+        token_key = key or cache.get(user_key)
+        keys = [user_key]
+        if token_key:
+            keys.append(get_token_cache_key(token_key))
+        cache.delete_many(keys)
+
+    transaction.on_commit(clear)
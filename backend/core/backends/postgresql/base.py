@@ -0,0 +1,60 @@
+from functools import partial
+
+from django.db.backends.postgresql import base
+
+from core.backends.postgresql.pool import get_pool
+
+
+class DatabaseWrapper(base.DatabaseWrapper):
+    """PostgreSQL с проверкой соединений и пулом соединений процесса.
+
+    С CONN_HEALTH_CHECKS постоянное соединение проверяется перед первым
+    запросом к базе в каждом запросе к API, как в Django 4.1. С POOL
+    соединения берутся из пула процесса и возвращаются в него вместо
+    закрытия.
+    """
+
+    health_check_done = False
+    connection_pool = None
+
+    @property
+    def pool(self):
+        """Возвращает пул соединений процесса или None без пула."""
+        return get_pool(self.alias, self.settings_dict)
+
+    def get_new_connection(self, conn_params):
+        self.connection_pool = self.pool
+        if self.connection_pool is None:
+            return super().get_new_connection(conn_params)
+        return self.connection_pool.get(
+            partial(super().get_new_connection, conn_params)
+        )
+
+    def _close(self):
+        """Возвращает соединение в пул, из которого оно было взято."""
+        pool = self.connection_pool
+        if pool is None or self.connection is None:
+            return super()._close()
+        with self.wrap_database_errors:
+            pool.put(self.connection)
+
+    def connect(self):
+        super().connect()
+        self.health_check_done = True
+
+    def ensure_connection(self):
+        """Проверяет соединение, сохранившееся с прошлого запроса."""
+        if (
+            self.connection is not None
+            and self.settings_dict.get('CONN_HEALTH_CHECKS')
+            and not self.health_check_done
+            and not self.in_atomic_block
+        ):
+            if not self.is_usable():
+                self.close()
+            self.health_check_done = True
+        super().ensure_connection()
+
+    def close_if_unusable_or_obsolete(self):
+        self.health_check_done = False
+        super().close_if_unusable_or_obsolete()
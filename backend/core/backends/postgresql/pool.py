@@ -0,0 +1,197 @@
+import os
+import threading
+import time
+from collections import deque
+
+from django.db.backends.postgresql.base import Database
+from psycopg2 import extensions
+
+from core.metrics import (
+    DB_POOL_CHECKED_OUT,
+    DB_POOL_SIZE,
+    DB_POOL_TIMEOUTS,
+    DB_POOL_WAIT,
+)
+
+POOLS = {}
+
+# Параметры подключения, с которыми соединение пула переиспользуется.
+CONNECTION_SETTINGS = ('NAME', 'HOST', 'PORT', 'USER')
+
+POOLS_LOCK = threading.Lock()
+
+
+class ConnectionPool:
+    """Пул соединений с базой данных одного процесса.
+
+    Поток получает соединение при первом запросе к базе и возвращает
+    его при закрытии соединения Django в конце запроса. Если открыто
+    max_size соединений и все заняты, поток ждет не дольше timeout.
+    """
+
+    def __init__(self, alias, max_size, timeout, max_lifetime,
+                 health_checks):
+        self.alias = alias
+        self.max_size = max_size
+        self.timeout = timeout
+        self.max_lifetime = max_lifetime
+        self.health_checks = health_checks
+        self.idle = deque()
+        self.created = {}
+        self.size = 0
+        self.closed = False
+        self.condition = threading.Condition()
+
+    def get(self, connect):
+        """Выдает свободное соединение или открывает новое через connect."""
+        started = time.monotonic()
+        with self.condition:
+            while not self.idle and self.size >= self.max_size:
+                remaining = started + self.timeout - time.monotonic()
+                if remaining <= 0:
+                    DB_POOL_TIMEOUTS.labels(self.alias).inc()
+                    raise Database.OperationalError(
+                        f'Нет свободных соединений с базой {self.alias} '
+                        f'за {self.timeout} с.'
+                    )
+                self.condition.wait(remaining)
+            if self.idle:
+                connection = self.idle.pop()
+            else:
+                connection = None
+                self.size += 1
+        DB_POOL_WAIT.labels(self.alias).observe(time.monotonic() - started)
+        if connection is not None and not self.is_usable(connection):
+            self.close_connection(connection)
+            connection = None
+        if connection is None:
+            connection = self.connect(connect)
+        DB_POOL_CHECKED_OUT.labels(self.alias).inc()
+        return connection
+
+    def put(self, connection):
+        """Возвращает соединение в пул или закрывает неисправное."""
+        DB_POOL_CHECKED_OUT.labels(self.alias).dec()
+        if self.closed or not self.reset(connection):
+            self.close_connection(connection)
+            self.release()
+            return
+        with self.condition:
+            self.idle.append(connection)
+            self.condition.notify()
+
+    def connect(self, connect):
+        """Открывает соединение на месте, занятом в get."""
+        try:
+            connection = connect()
+        except Exception:
+            self.release()
+            raise
+        self.created[connection] = time.monotonic()
+        DB_POOL_SIZE.labels(self.alias).set(self.size)
+        return connection
+
+    def close_connection(self, connection):
+        """Закрывает соединение, не освобождая его место в пуле."""
+        self.created.pop(connection, None)
+        try:
+            connection.close()
+        except Database.Error:
+            pass
+
+    def release(self):
+        """Освобождает место закрытого соединения для ждущих потоков."""
+        with self.condition:
+            self.size -= 1
+            self.condition.notify()
+        DB_POOL_SIZE.labels(self.alias).set(self.size)
+
+    def is_expired(self, connection):
+        """Проверяет, что соединение старше max_lifetime."""
+        return (
+            self.max_lifetime is not None
+            and time.monotonic() - self.created[connection]
+            >= self.max_lifetime
+        )
+
+    def is_usable(self, connection):
+        """Проверяет соединение перед выдачей потоку."""
+        if connection.closed or self.is_expired(connection):
+            return False
+        if not self.health_checks:
+            return True
+        try:
+            with connection.cursor() as cursor:
+                cursor.execute('SELECT 1')
+        except Database.Error:
+            return False
+        return True
+
+    def reset(self, connection):
+        """Откатывает незавершенную транзакцию возвращаемого соединения."""
+        if connection.closed or self.is_expired(connection):
+            return False
+        status = connection.get_transaction_status()
+        if status == extensions.TRANSACTION_STATUS_UNKNOWN:
+            return False
+        try:
+            if status != extensions.TRANSACTION_STATUS_IDLE:
+                connection.rollback()
+            connection.autocommit = True
+        except Database.Error:
+            return False
+        return True
+
+    def close(self):
+        """Закрывает свободные соединения пула.
+
+        Занятые соединения закрываются при возврате в пул.
+        """
+        with self.condition:
+            self.closed = True
+            idle, self.idle = list(self.idle), deque()
+        for connection in idle:
+            self.close_connection(connection)
+            self.release()
+
+
+def get_pool(alias, settings_dict):
+    """Возвращает пул соединений базы в текущем процессе.
+
+    Без POOL.MAX_SIZE в настройках базы пул не используется. Пул
+    определяется и параметрами подключения: после их изменения, как
+    при создании тестовой базы, свободные соединения старого пула
+    закрываются, а соединения берутся из нового. Пулы, унаследованные
+    от родительского процесса при fork, отбрасываются без закрытия:
+    их сокеты принадлежат родителю.
+    """
+    options = settings_dict.get('POOL') or {}
+    if not options.get('MAX_SIZE'):
+        return None
+    key = (os.getpid(), alias, *(
+        settings_dict.get(name) for name in CONNECTION_SETTINGS
+    ))
+    pool = POOLS.get(key)
+    if pool is None:
+        with POOLS_LOCK:
+            for item in list(POOLS):
+                if item[0] != key[0]:
+                    del POOLS[item]
+                elif item[1] == alias and item != key:
+                    POOLS.pop(item).close()
+            pool = POOLS.setdefault(key, ConnectionPool(
+                alias,
+                options['MAX_SIZE'],
+                options.get('TIMEOUT', 10),
+                options.get('MAX_LIFETIME'),
+                settings_dict.get('CONN_HEALTH_CHECKS', False),
+            ))
+    return pool
+
+
+def close_pools():
+    """Закрывает свободные соединения всех пулов текущего процесса."""
+    pid = os.getpid()
+    for (owner, *_), pool in list(POOLS.items()):
+        if owner == pid:
+            pool.close()
@@ -0,0 +1,271 @@
+import math
+import tempfile
+import time
+
+from django.db import connection, transaction
+from django.db.models import Count
+from django.test.utils import override_settings
+from rest_framework.authtoken.models import Token
+from rest_framework.test import APIClient
+
+from core.metrics import QueryCounter
+from recipes.models import Favorite, Ingredient, Recipe, ShoppingCart, Tag
+from users.models import Follow, User
+
+IMAGE = (
+    'data:image/gif;base64,R0lGODlhAQABAIAAAP///wAAACH5BAEAAAAALAAAAAABAAEA'
+    'AAICRAEAOw=='
+)
+
+PERCENTILES = (50, 95, 99)
+
+
+def get_context():
+    """Выбирает пользователя и объекты, над которыми выполняются запросы.
+
+    Берется автор рецептов с наибольшим числом подписок, чтобы лента
+    и подписки не были пустыми. Изменяется и удаляется его рецепт,
+    который есть в избранном и списках покупок.
+    """
+    user = User.objects.filter(recipes__isnull=False).annotate(
+        follows=Count('subscriber', distinct=True)
+    ).order_by('-follows', 'pk').first() or User.objects.first()
+    if user is None or not Recipe.objects.exists():
+        return None
+    other_recipes = Recipe.objects.exclude(author=user)
+    return {
+        'user': user,
+        'recipe': Recipe.objects.order_by('-pub_date').first().pk,
+        'own_recipe': user.recipes.filter(
+            favorites_count__gt=0, shopping_cart_count__gt=0
+        ).values_list('pk', flat=True).first(),
+        'new_recipe': other_recipes.exclude(
+            favorite__user=user
+        ).exclude(
+            shoppingcart__user=user
+        ).values_list('pk', flat=True).first(),
+        'favorite': Favorite.objects.filter(
+            user=user
+        ).values_list('recipe_id', flat=True).first(),
+        'shopping_cart': ShoppingCart.objects.filter(
+            user=user
+        ).values_list('recipe_id', flat=True).first(),
+        'author': User.objects.exclude(pk=user.pk).exclude(
+            following__user=user
+        ).filter(
+            recipes__isnull=False
+        ).values_list('pk', flat=True).first(),
+        'following': Follow.objects.filter(
+            user=user
+        ).values_list('following_id', flat=True).first(),
+        'tags': list(Tag.objects.values_list('pk', flat=True)[:2]),
+        'ingredients': list(
+            Ingredient.objects.values_list('pk', flat=True)[:5]
+        ),
+        'ingredient': Ingredient.objects.values_list(
+            'pk', 'name'
+        ).first(),
+        'search': Recipe.objects.values_list('name', flat=True).first(),
+    }
+
+
+def get_scenarios(context):
+    """Возвращает сценарии: имя, метод, адрес, тело и нужна ли авторизация.
+
+    Сценарии, для которых в базе нет подходящих объектов, пропускаются.
+    """
+    recipe_data = {
+        'name': 'Замер производительности',
+        'text': 'Рецепт создается и откатывается при замере.',
+        'cooking_time': 10,
+        'image': IMAGE,
+        'tags': context['tags'],
+        'ingredients': [
+            {'id': pk, 'amount': amount}
+            for amount, pk in enumerate(context['ingredients'], start=1)
+        ],
+    }
+    update_data = get_update_data(context, recipe_data)
+    ingredient_id, ingredient_name = context['ingredient']
+    search = ingredient_name.split()[0]
+    scenarios = (
+        ('recipes_list_anonymous', 'get', '/api/recipes/', None, False),
+        ('recipes_list', 'get', '/api/recipes/', None, True),
+        ('recipes_list_cursor', 'get', '/api/recipes/?cursor=', None, True),
+        ('recipes_list_tags', 'get', '/api/recipes/?tags='
+         + '&tags='.join(
+             Tag.objects.filter(
+                 pk__in=context['tags']
+             ).values_list('slug', flat=True)
+         ), None, True),
+        ('recipes_search', 'get',
+         f'/api/recipes/?search={context["search"].split()[0]}',
+         None, True),
+        ('recipes_popular', 'get', '/api/recipes/?ordering=popular',
+         None, True),
+        ('recipes_trending', 'get', '/api/recipes/?ordering=trending',
+         None, True),
+        ('recipes_feed', 'get', '/api/recipes/feed/', None, True),
+        ('recipe_detail', 'get', f'/api/recipes/{context["recipe"]}/',
+         None, True),
+        ('recipe_create', 'post', '/api/recipes/', recipe_data, True),
+        ('recipe_update', 'patch', f'/api/recipes/{context["own_recipe"]}/',
+         update_data, True),
+        ('recipe_delete', 'delete',
+         f'/api/recipes/{context["own_recipe"]}/', None, True),
+        ('favorite_add', 'post',
+         f'/api/recipes/{context["new_recipe"]}/favorite/', None, True),
+        ('favorite_remove', 'delete',
+         f'/api/recipes/{context["favorite"]}/favorite/', None, True),
+        ('favorite_batch', 'post', '/api/recipes/favorite/batch/',
+         {'recipes': [context['new_recipe']]}, True),
+        ('shopping_cart_add', 'post',
+         f'/api/recipes/{context["new_recipe"]}/shopping_cart/', None, True),
+        ('shopping_cart_remove', 'delete',
+         f'/api/recipes/{context["shopping_cart"]}/shopping_cart/',
+         None, True),
+        ('download_shopping_cart', 'get',
+         '/api/recipes/download_shopping_cart/', None, True),
+        ('users_list', 'get', '/api/users/', None, True),
+        ('user_detail', 'get', f'/api/users/{context["author"]}/',
+         None, True),
+        ('users_me', 'get', '/api/users/me/', None, True),
+        ('subscriptions', 'get', '/api/users/subscriptions/', None, True),
+        ('subscribe', 'post', f'/api/users/{context["author"]}/subscribe/',
+         None, True),
+        ('unsubscribe', 'delete',
+         f'/api/users/{context["following"]}/subscribe/', None, True),
+        ('tags_list', 'get', '/api/tags/', None, False),
+        ('ingredients_search', 'get', f'/api/ingredients/?name={search}',
+         None, False),
+        ('ingredient_detail', 'get', f'/api/ingredients/{ingredient_id}/',
+         None, False),
+    )
+    return tuple(
+        scenario for scenario in scenarios if '/None/' not in scenario[2]
+        and None not in (scenario[3] or {}).get('recipes', ())
+    )
+
+
+def get_update_data(context, recipe_data):
+    """Возвращает тело изменения рецепта пользователя.
+
+    Первый ингредиент рецепта удаляется, количество остальных
+    меняется и добавляется новый ингредиент, поэтому изменение
+    проходит все ветки обновления ингредиентов. Теги не меняются,
+    чтобы число запросов не зависело от тегов рецепта.
+    """
+    data = {
+        key: value for key, value in recipe_data.items() if key != 'image'
+    }
+    own_recipe = Recipe.objects.filter(pk=context['own_recipe']).first()
+    if own_recipe is None:
+        return data
+    kept = list(own_recipe.recipe_ingredient.order_by(
+        'pk'
+    ).values_list('ingredient_id', 'amount'))[1:]
+    new = Ingredient.objects.exclude(
+        recipe_ingredient__recipe=own_recipe
+    ).values_list('pk', flat=True).first()
+    data['tags'] = list(own_recipe.tags.values_list('pk', flat=True))
+    data['ingredients'] = [
+        {'id': ingredient_id, 'amount': amount % 500 + 1}
+        for ingredient_id, amount in kept
+    ] + [{'id': new, 'amount': 1}]
+    return data
+
+
+def get_percentile(values, percentile):
+    """Возвращает перцентиль по методу ближайшего ранга."""
+    values = sorted(values)
+    return values[max(math.ceil(percentile / 100 * len(values)) - 1, 0)]
+
+
+def run_request(client, method, url, data, keep_sql=False):
+    """Выполняет запрос и возвращает время, SQL запросы и ответ.
+
+    Изменяющие запросы выполняются в транзакции, которая откатывается,
+    поэтому повторные запуски видят одни и те же данные.
+    """
+    queries = QueryCounter(keep_sql)
+    with transaction.atomic():
+        with connection.execute_wrapper(queries):
+            started = time.perf_counter()
+            response = getattr(client, method)(url, data, format='json')
+            if response.streaming:
+                b''.join(response.streaming_content)
+            duration = time.perf_counter() - started
+        transaction.set_rollback(True)
+    return duration, queries, response
+
+
+def run_scenario(clients, scenario, requests, warmup, keep_sql=False):
+    """Выполняет сценарий и возвращает сводку по времени и запросам.
+
+    С keep_sql=True в сводку добавляются SQL запросы последнего запроса.
+    """
+    name, method, url, data, authenticated = scenario
+    client = clients[authenticated]
+    for _ in range(warmup):
+        run_request(client, method, url, data)
+    durations, query_counts, statuses = [], [], set()
+    for _ in range(requests):
+        duration, queries, response = run_request(
+            client, method, url, data, keep_sql
+        )
+        durations.append(duration)
+        query_counts.append(queries.count)
+        statuses.add(response.status_code)
+    result = {
+        'method': method.upper(),
+        'url': url,
+        'requests': requests,
+        'statuses': sorted(statuses),
+        'queries_min': min(query_counts),
+        'queries_max': max(query_counts),
+        'mean_ms': sum(durations) / requests * 1000,
+        'throughput_rps': requests / sum(durations),
+    }
+    for percentile in PERCENTILES:
+        result[f'p{percentile}_ms'] = (
+            get_percentile(durations, percentile) * 1000
+        )
+    if keep_sql:
+        result['sql'] = queries.statements
+    return result
+
+
+def run_benchmark(requests, warmup, names=None, keep_sql=False):
+    """Прогоняет сценарии через тестовый клиент Django.
+
+    Картинки создаваемых рецептов сохраняются во временный каталог.
+    """
+    context = get_context()
+    if context is None:
+        return {}
+    token, _ = Token.objects.get_or_create(user=context['user'])
+    clients = {False: APIClient(), True: APIClient()}
+    clients[True].credentials(HTTP_AUTHORIZATION=f'Token {token.key}')
+    results = {}
+    with tempfile.TemporaryDirectory() as media_root, override_settings(
+        ALLOWED_HOSTS=['testserver'],
+        MEDIA_ROOT=media_root,
+    ):
+        for scenario in get_scenarios(context):
+            if names and scenario[0] not in names:
+                continue
+            results[scenario[0]] = run_scenario(
+                clients, scenario, requests, warmup, keep_sql
+            )
+    return results
+
+
+def get_dataset_size():
+    """Возвращает размеры таблиц, на которых выполнялся замер."""
+    return {
+        'users': User.objects.count(),
+        'recipes': Recipe.objects.count(),
+        'favorites': Favorite.objects.count(),
+        'shopping_carts': ShoppingCart.objects.count(),
+        'follows': Follow.objects.count(),
+    }
@@ -0,0 +1,103 @@
+import time
+
+from django.core.cache import cache
+from django.utils.http import urlencode
+
+from core.consts import VERSION_CACHE_TIMEOUT
+from core.transactions import on_commit_once
+
+CATALOG_VERSION_KEY = 'catalog:version'
+
+RECIPES_VERSION_KEY = 'recipes:version'
+
+
+def get_recipe_version_key(pk):
+    """Возвращает ключ версии рецепта."""
+    return f'recipe:{pk}:version'
+
+
+def get_user_version_key(pk):
+    """Возвращает ключ версии пользователя."""
+    return f'user:{pk}:version'
+
+
+def get_token_cache_key(key):
+    """Возвращает ключ кеша токена авторизации."""
+    return f'auth:token:{key}'
+
+
+def get_user_token_cache_key(pk):
+    """Возвращает ключ кеша, в котором хранится токен пользователя."""
+    return f'auth:user:{pk}:token'
+
+
+def get_new_version(previous=0):
+    """Возвращает новую версию - время в миллисекундах.
+
+    Версия растет и после перезапуска с пустым кешем.
+    """
+    return max(int(time.time() * 1000), previous + 1)
+
+
+def get_versions(keys):
+    """Возвращает версии по ключам, создавая отсутствующие.
+
+    Версии живут не дольше VERSION_CACHE_TIMEOUT: если изменение
+    записано в кеш другого процесса, устаревшие ответы отдаются
+    не дольше этого времени.
+    """
+    versions = cache.get_many(keys)
+    missing = {
+        key: get_new_version() for key in keys if key not in versions
+    }
+    if missing:
+        cache.set_many(missing, timeout=VERSION_CACHE_TIMEOUT)
+        versions.update(missing)
+    return versions
+
+
+def bump_version(key):
+    """Увеличивает версию после изменения данных."""
+    version = get_new_version(cache.get(key, 0))
+    cache.set(key, version, timeout=VERSION_CACHE_TIMEOUT)
+    return version
+
+
+def bump_versions(keys):
+    """Увеличивает несколько версий одним обращением к кешу."""
+    versions = cache.get_many(keys)
+    cache.set_many({
+        key: get_new_version(versions.get(key, 0)) for key in keys
+    }, timeout=VERSION_CACHE_TIMEOUT)
+
+
+def schedule_version_bump(*keys):
+    """Увеличивает версии после фиксации транзакции.
+
+    Если увеличить версию до фиксации, параллельный запрос успеет
+    прочитать старые данные и сохранить их в кеш под новой версией.
+    """
+    on_commit_once('versions', keys, bump_versions)
+
+
+def get_catalog_version():
+    """Возвращает текущую версию справочников тегов и ингредиентов."""
+    return get_versions((CATALOG_VERSION_KEY,))[CATALOG_VERSION_KEY]
+
+
+def bump_catalog_version():
+    """Увеличивает версию справочников после их изменения."""
+    return bump_version(CATALOG_VERSION_KEY)
+
+
+def get_request_cache_key(prefix, request):
+    """Возвращает ключ кеша с нормализованной строкой запроса.
+
+    Ответы содержат абсолютные ссылки на картинки, поэтому схема
+    и хост запроса входят в ключ.
+    """
+    query = urlencode(sorted(request.query_params.lists()), doseq=True)
+    return (
+        f'{prefix}:{request.accepted_renderer.format}:'
+        f'{request.scheme}://{request.get_host()}{request.path}?{query}'
+    )
@@ -13,3 +13,50 @@ MAX_TEXT_RECIPES = 20
 MAX_VALUE_VALIDATOR = 32767
 
 MAX_VALUE_VALIDATOR_MINUTES = 4320
+
+CATALOG_CACHE_TIMEOUT = 60 * 60 * 24
+
+ANONYMOUS_CACHE_TIMEOUT = 60 * 5
+
+TOKEN_CACHE_TIMEOUT = 60
+
+VERSION_CACHE_TIMEOUT = 60 * 60
+
+IMAGE_RENDITIONS = {
+    'thumbnail': (160, 160),
+    'card': (480, 480),
+    'full': (1280, 1280),
+}
+
+IMAGE_RENDITION_FORMAT = 'WEBP'
+
+IMAGE_RENDITION_QUALITY = 80
+
+LIST_IMAGE_RENDITION = 'card'
+
+SHORT_IMAGE_RENDITION = 'thumbnail'
+
+MAX_BATCH_RECIPES = 100
+
+FEED_FANOUT_LIMIT = 10000
+
+FEED_BATCH_SIZE = 1000
+
+SCORE_ORDERINGS = (
+    ('popular', 'По популярности'),
+    ('trending', 'По набирающим популярность'),
+)
+
+TRENDING_HALF_LIFE = 60 * 60 * 24
+
+TRENDING_MIN_SCORE = 0.01
+
+SCORE_BATCH_SIZE = 1000
+
+ASYNC_ACTIONS = (
+    'list',
+    'retrieve',
+    'subscriptions',
+    'feed',
+    'download_shopping_cart',
+)
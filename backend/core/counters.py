@@ -0,0 +1,20 @@
+from django.db.models import Count, F, OuterRef, Subquery, Value
+from django.db.models.functions import Coalesce
+
+
+def change_counter(model, field, delta, **filters):
+    """Атомарно изменяет счетчик модели F-выражением."""
+    if delta:
+        model.objects.filter(**filters).update(**{field: F(field) + delta})
+
+
+def recount_counter(model, field, related_model, related_field):
+    """Пересчитывает счетчик модели по связанным записям."""
+    counts = related_model.objects.filter(
+        **{related_field: OuterRef('pk')}
+    ).order_by().values(related_field).annotate(
+        count=Count('pk')
+    ).values('count')
+    return model.objects.update(
+        **{field: Coalesce(Subquery(counts), Value(0))}
+    )
@@ -1,20 +1,69 @@
+from django.db.models import BooleanField, Case, Value, When
 from django_filters import rest_framework as filters
 
+from core.consts import MIN_VALUE_VALIDATOR, SCORE_ORDERINGS
 from recipes.models import Ingredient, Recipe, Tag
+from recipes.search import search_recipes
 
 
 class IngredientFilter(filters.FilterSet):
-    """Фильтр для ингредиентов."""
+    """Фильтр для ингредиентов.
 
-    name = filters.CharFilter(
-        field_name='name',
-        lookup_expr='icontains',
+    Ингредиенты, начинающиеся с искомой строки, выводятся раньше
+    ингредиентов, содержащих ее в середине названия.
+    """
+
+    name = filters.CharFilter(method='get_name')
+    limit = filters.NumberFilter(
+        method='get_limit',
+        min_value=MIN_VALUE_VALIDATOR,
     )
 
     class Meta:
         model = Ingredient
         fields = ('name',)
 
+    def get_name(self, queryset, name, value):
+        """Ищет ингредиенты по названию с ранжированием."""
+        return queryset.filter(
+            name__icontains=value
+        ).annotate(
+            is_prefix=Case(
+                When(name__istartswith=value, then=Value(True)),
+                default=Value(False),
+                output_field=BooleanField(),
+            )
+        ).order_by('-is_prefix', 'name')
+
+    def get_limit(self, queryset, name, value):
+        """Ограничение количества выполняется после всех фильтров."""
+        return queryset
+
+    def filter_queryset(self, queryset):
+        """Ограничивает количество найденных ингредиентов.
+
+        С ограничением ингредиенты, начинающиеся с искомой строки,
+        выбираются по индексу префиксов названий. Ингредиенты, содержащие
+        ее в середине названия, ищутся, только если первых не хватило.
+        """
+        limit = self.form.cleaned_data.get('limit')
+        value = self.form.cleaned_data.get('name')
+        if not limit:
+            return super().filter_queryset(queryset)
+        limit = int(limit)
+        if not value:
+            return super().filter_queryset(queryset)[:limit]
+        found = list(
+            queryset.filter(name__istartswith=value).order_by('name')[:limit]
+        )
+        if len(found) < limit:
+            found += queryset.filter(
+                name__icontains=value
+            ).exclude(
+                name__istartswith=value
+            ).order_by('name')[:limit - len(found)]
+        return found
+
 
 class RecipeFilter(filters.FilterSet):
     """Фильтр для полученяи рецептов."""
@@ -30,6 +79,11 @@ class RecipeFilter(filters.FilterSet):
     is_in_shopping_cart = filters.BooleanFilter(
         method='get_is_in_shopping_cart'
     )
+    search = filters.CharFilter(method='get_search')
+    ordering = filters.ChoiceFilter(
+        choices=SCORE_ORDERINGS,
+        method='get_ordering',
+    )
 
     class Meta:
         model = Recipe
@@ -38,6 +92,8 @@ class RecipeFilter(filters.FilterSet):
             'tags',
             'is_favorited',
             'is_in_shopping_cart',
+            'search',
+            'ordering',
         )
 
     def get_is_favorited(self, queryset, name, value):
@@ -51,3 +107,13 @@ class RecipeFilter(filters.FilterSet):
         if value:
             return queryset.filter(shoppingcart__user=self.request.user)
         return queryset
+
+    def get_search(self, queryset, name, value):
+        """Ищет рецепты по названию, описанию и ингредиентам."""
+        return search_recipes(queryset, value)
+
+    def get_ordering(self, queryset, name, value):
+        """Сортирует рецепты по заранее рассчитанному рейтингу."""
+        return queryset.filter(score__isnull=False).order_by(
+            f'-score__{value}', '-score__recipe'
+        )
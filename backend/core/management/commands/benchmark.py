@@ -0,0 +1,113 @@
+import json
+import subprocess
+
+from django.core.management import BaseCommand, CommandError
+from django.db import connection
+from django.utils import timezone
+
+from core.benchmark import get_dataset_size, run_benchmark
+
+
+class Command(BaseCommand):
+    """Замер производительности эндпоинтов API."""
+
+    help = (
+        'Выполняет запросы ко всем эндпоинтам API через тестовый клиент '
+        'Django и выводит p50/p95/p99 времени ответа, число SQL запросов '
+        'и пропускную способность. Изменяющие запросы откатываются. '
+        'Результат сохраняется в JSON для сравнения между коммитами.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--requests',
+            type=int,
+            default=50,
+            help='Количество замеряемых запросов в каждом сценарии.',
+        )
+        parser.add_argument(
+            '--warmup',
+            type=int,
+            default=5,
+            help='Количество прогревочных запросов перед замером.',
+        )
+        parser.add_argument(
+            '--scenario',
+            action='append',
+            help='Выполнить только указанный сценарий. Можно повторять.',
+        )
+        parser.add_argument('--output', help='Путь к файлу JSON с отчетом.')
+        parser.add_argument(
+            '--compare',
+            help='Путь к отчету JSON, с которым сравниваются результаты.',
+        )
+
+    def handle(self, *args, **options):
+        """Выполняет замер, выводит таблицу и сохраняет отчет."""
+        if options['requests'] < 1 or options['warmup'] < 0:
+            raise CommandError('Количество запросов должно быть больше нуля.')
+        baseline = None
+        if options['compare']:
+            with open(options['compare'], encoding='utf-8') as file:
+                baseline = json.load(file)['results']
+        results = run_benchmark(
+            options['requests'], options['warmup'], options['scenario']
+        )
+        if not results:
+            raise CommandError(
+                'В базе нет рецептов. Создайте данные командой '
+                'generate_dataset.'
+            )
+        report = {
+            'created': timezone.now().isoformat(),
+            'commit': self.get_commit(),
+            'database': connection.vendor,
+            'dataset': get_dataset_size(),
+            'results': results,
+        }
+        self.write_table(results, baseline)
+        if options['output']:
+            with open(options['output'], 'w', encoding='utf-8') as file:
+                json.dump(report, file, ensure_ascii=False, indent=2)
+            self.stdout.write(self.style.SUCCESS(
+                f'Отчет сохранен в {options["output"]}.'
+            ))
+
+    @staticmethod
+    def get_commit():
+        """Возвращает текущий коммит, если код лежит в git."""
+        try:
+            return subprocess.run(
+                ('git', 'rev-parse', '--short', 'HEAD'),
+                capture_output=True,
+                check=True,
+                text=True,
+            ).stdout.strip()
+        except (OSError, subprocess.CalledProcessError):
+            return None
+
+    def write_table(self, results, baseline):
+        """Выводит результаты и изменения относительно прошлого отчета."""
+        self.stdout.write(
+            f'{"Сценарий":<26}{"p50 мс":>9}{"p95 мс":>9}{"p99 мс":>9}'
+            f'{"SQL":>6}{"RPS":>8}  Статусы'
+        )
+        for name, result in results.items():
+            line = (
+                f'{name:<26}{result["p50_ms"]:>9.2f}'
+                f'{result["p95_ms"]:>9.2f}{result["p99_ms"]:>9.2f}'
+                f'{result["queries_max"]:>6}'
+                f'{result["throughput_rps"]:>8.0f}  '
+                f'{",".join(map(str, result["statuses"]))}'
+            )
+            previous = (baseline or {}).get(name)
+            if previous:
+                change = self.get_change(previous['p95_ms'], result['p95_ms'])
+                queries = result['queries_max'] - previous['queries_max']
+                line += f'  p95 {change}, SQL {queries:+d}'
+            self.stdout.write(line)
+
+    @staticmethod
+    def get_change(previous, current):
+        """Возвращает изменение в процентах."""
+        return f'{(current - previous) / previous * 100:+.0f}%'
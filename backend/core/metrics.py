@@ -0,0 +1,198 @@
+import os
+import time
+from contextlib import contextmanager
+from contextvars import ContextVar
+
+from prometheus_client import (
+    CollectorRegistry,
+    Counter,
+    Gauge,
+    Histogram,
+    generate_latest,
+    multiprocess,
+)
+
+REQUEST_LABELS = ('view', 'action', 'method')
+
+CURRENT_QUERIES = ContextVar('current_queries', default=None)
+
+CURRENT_SERIALIZATION = ContextVar('current_serialization', default=None)
+
+REQUESTS = Counter(
+    'foodgram_requests',
+    'Количество обработанных запросов.',
+    (*REQUEST_LABELS, 'status'),
+)
+REQUEST_DURATION = Histogram(
+    'foodgram_request_duration_seconds',
+    'Время обработки запроса.',
+    REQUEST_LABELS,
+)
+DB_QUERIES = Histogram(
+    'foodgram_db_queries_per_request',
+    'Количество SQL запросов на один запрос к API.',
+    REQUEST_LABELS,
+    buckets=(1, 2, 3, 5, 8, 13, 21, 34, 55, 89, float('inf')),
+)
+DB_DURATION = Histogram(
+    'foodgram_db_duration_seconds',
+    'Суммарное время SQL запросов одного запроса к API.',
+    REQUEST_LABELS,
+)
+SERIALIZATION_DURATION = Histogram(
+    'foodgram_serialization_duration_seconds',
+    'Время преобразования объектов ответа сериализаторами.',
+    REQUEST_LABELS,
+)
+RENDER_DURATION = Histogram(
+    'foodgram_render_duration_seconds',
+    'Время рендеринга данных ответа в байты.',
+    REQUEST_LABELS,
+)
+RESPONSE_SIZE = Histogram(
+    'foodgram_response_size_bytes',
+    'Размер тела ответа.',
+    REQUEST_LABELS,
+    buckets=(
+        256, 1024, 4096, 16384, 65536, 262144, 1048576, float('inf')
+    ),
+)
+DB_POOL_SIZE = Gauge(
+    'foodgram_db_pool_connections',
+    'Количество открытых соединений пула процесса.',
+    ('alias',),
+    multiprocess_mode='livesum',
+)
+DB_POOL_CHECKED_OUT = Gauge(
+    'foodgram_db_pool_checked_out',
+    'Количество соединений пула, выданных потокам.',
+    ('alias',),
+    multiprocess_mode='livesum',
+)
+DB_POOL_WAIT = Histogram(
+    'foodgram_db_pool_wait_seconds',
+    'Время ожидания свободного соединения пула.',
+    ('alias',),
+    buckets=(
+        0.0005, 0.001, 0.005, 0.01, 0.05, 0.1, 0.5, 1, 5, float('inf')
+    ),
+)
+DB_POOL_TIMEOUTS = Counter(
+    'foodgram_db_pool_timeouts',
+    'Количество запросов соединения, не дождавшихся свободного.',
+    ('alias',),
+)
+
+
+def get_metrics():
+    """Возвращает метрики в текстовом формате Prometheus.
+
+    С переменной окружения PROMETHEUS_MULTIPROC_DIR метрики собираются
+    из файлов всех процессов gunicorn, иначе отдаются метрики процесса,
+    обработавшего запрос.
+    """
+    if not os.getenv('PROMETHEUS_MULTIPROC_DIR'):
+        return generate_latest()
+    registry = CollectorRegistry()
+    multiprocess.MultiProcessCollector(registry)
+    return generate_latest(registry)
+
+
+class QueryCounter:
+    """Обертка выполнения SQL, считающая запросы и их время.
+
+    С keep_sql=True также сохраняет тексты запросов.
+    """
+
+    def __init__(self, keep_sql=False):
+        self.count = 0
+        self.duration = 0.0
+        self.statements = [] if keep_sql else None
+
+    def __call__(self, execute, sql, params, many, context):
+        started = time.perf_counter()
+        try:
+            return execute(sql, params, many, context)
+        finally:
+            self.count += 1
+            self.duration += time.perf_counter() - started
+            if self.statements is not None:
+                self.statements.append(sql)
+
+
+def count_query(execute, sql, params, many, context):
+    """Передает SQL запрос счетчику текущего запроса к API.
+
+    Подключается ко всем соединениям, поэтому учитываются и запросы
+    из потоков, в которых под ASGI выполняются представления.
+    """
+    queries = CURRENT_QUERIES.get()
+    if queries is None:
+        return execute(sql, params, many, context)
+    return queries(execute, sql, params, many, context)
+
+
+@contextmanager
+def count_queries(queries):
+    """Назначает счетчик SQL запросов текущему контексту."""
+    token = CURRENT_QUERIES.set(queries)
+    try:
+        yield queries
+    finally:
+        CURRENT_QUERIES.reset(token)
+
+
+class SerializationTimer:
+    """Суммарное время работы сериализаторов одного запроса."""
+
+    def __init__(self):
+        self.duration = 0.0
+        self.depth = 0
+
+
+@contextmanager
+def track_serialization(timer):
+    """Назначает таймер сериализации текущему контексту."""
+    token = CURRENT_SERIALIZATION.set(timer)
+    try:
+        yield timer
+    finally:
+        CURRENT_SERIALIZATION.reset(token)
+
+
+@contextmanager
+def measure_serialization():
+    """Добавляет время блока к таймеру сериализации текущего запроса.
+
+    Время вложенных сериализаторов уже входит во время внешнего,
+    поэтому замеряется только самый внешний блок.
+    """
+    timer = CURRENT_SERIALIZATION.get()
+    if timer is None or timer.depth:
+        yield
+        return
+    timer.depth += 1
+    started = time.perf_counter()
+    try:
+        yield
+    finally:
+        timer.duration += time.perf_counter() - started
+        timer.depth -= 1
+
+
+def get_request_labels(request):
+    """Возвращает вьюсет, действие и метод запроса для меток метрик.
+
+    Метки берутся из найденного маршрута, а не из пути запроса,
+    поэтому число рядов метрик не растет вместе с числом объектов.
+    """
+    match = getattr(request, 'resolver_match', None)
+    if match is None:
+        return 'unresolved', '', request.method
+    view = getattr(match.func, 'cls', match.func)
+    actions = getattr(match.func, 'actions', None) or {}
+    return (
+        view.__name__,
+        actions.get(request.method.lower(), ''),
+        request.method,
+    )
@@ -0,0 +1,85 @@
+import time
+
+from asgiref.sync import iscoroutinefunction, markcoroutinefunction
+
+from core.metrics import (
+    DB_DURATION,
+    DB_QUERIES,
+    RENDER_DURATION,
+    REQUEST_DURATION,
+    REQUESTS,
+    RESPONSE_SIZE,
+    SERIALIZATION_DURATION,
+    QueryCounter,
+    SerializationTimer,
+    count_queries,
+    get_request_labels,
+    track_serialization,
+)
+
+
+class MetricsMiddleware:
+    """Сбор метрик запросов для Prometheus.
+
+    Для каждого вьюсета и действия записываются время ответа,
+    количество и время SQL запросов, время работы сериализаторов,
+    время рендеринга и размер ответа.
+    Работает и под WSGI, и под ASGI без переключения потоков.
+    """
+
+    sync_capable = True
+    async_capable = True
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+        self.is_async = iscoroutinefunction(get_response)
+        if self.is_async:
+            markcoroutinefunction(self)
+
+    def __call__(self, request):
+        if self.is_async:
+            return self.__acall__(request)
+        started = time.perf_counter()
+        with count_queries(QueryCounter()) as queries, track_serialization(
+            SerializationTimer()
+        ) as serialization:
+            response = self.get_response(request)
+        self.observe(request, response, queries, serialization, started)
+        return response
+
+    async def __acall__(self, request):
+        started = time.perf_counter()
+        with count_queries(QueryCounter()) as queries, track_serialization(
+            SerializationTimer()
+        ) as serialization:
+            response = await self.get_response(request)
+        self.observe(request, response, queries, serialization, started)
+        return response
+
+    @staticmethod
+    def observe(request, response, queries, serialization, started):
+        """Записывает метрики обработанного запроса."""
+        duration = time.perf_counter() - started
+        labels = get_request_labels(request)
+        REQUESTS.labels(*labels, response.status_code).inc()
+        REQUEST_DURATION.labels(*labels).observe(duration)
+        DB_QUERIES.labels(*labels).observe(queries.count)
+        DB_DURATION.labels(*labels).observe(queries.duration)
+        if serialization.duration:
+            SERIALIZATION_DURATION.labels(*labels).observe(
+                serialization.duration
+            )
+        if not response.streaming:
+            RESPONSE_SIZE.labels(*labels).observe(len(response.content))
+
+    def process_template_response(self, request, response):
+        """Замеряет рендеринг ответа DRF после работы вьюсета."""
+        started = time.perf_counter()
+
+        def observe(response):
+            RENDER_DURATION.labels(*get_request_labels(request)).observe(
+                time.perf_counter() - started
+            )
+
+        response.add_post_render_callback(observe)
+        return response
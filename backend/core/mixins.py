@@ -0,0 +1,142 @@
+import gzip
+import json
+
+from django.core.cache import cache
+from django.http import HttpResponse
+from django.utils.cache import get_conditional_response, patch_vary_headers
+from django.utils.http import http_date
+from rest_framework import status
+from rest_framework.renderers import JSONRenderer
+from rest_framework.response import Response
+
+from core.caches import (
+    get_catalog_version,
+    get_request_cache_key,
+    get_versions,
+)
+from core.consts import ANONYMOUS_CACHE_TIMEOUT, CATALOG_CACHE_TIMEOUT
+from core.metrics import measure_serialization
+
+
+class CatalogCacheMixin:
+    """Кеширование и условная отдача справочников.
+
+    Ответы кешируются под версией справочников, которая меняется
+    при сохранении и удалении записей. Полный список без параметров
+    хранится уже сериализованным в JSON и сжатым gzip.
+    """
+
+    def list(self, request, *args, **kwargs):
+        return self.get_catalog_response(
+            super().list, request, *args, **kwargs
+        )
+
+    def retrieve(self, request, *args, **kwargs):
+        return self.get_catalog_response(
+            super().retrieve, request, *args, **kwargs
+        )
+
+    def get_catalog_response(self, handler, request, *args, **kwargs):
+        """Возвращает ответ из кеша или 304, если он не изменился."""
+        version = get_catalog_version()
+        headers = {
+            'ETag': f'"{version}"',
+            'Last-Modified': http_date(version // 1000),
+        }
+        response = get_conditional_response(
+            request._request,
+            etag=headers['ETag'],
+            last_modified=version // 1000,
+        )
+        if response is None:
+            if self.action == 'list' and not request.query_params and (
+                isinstance(request.accepted_renderer, JSONRenderer)
+            ):
+                response = self.get_precompressed_response(
+                    handler, request, version, *args, **kwargs
+                )
+            else:
+                key = get_request_cache_key(f'catalog:{version}', request)
+                data = cache.get(key)
+                if data is None:
+                    data = handler(request, *args, **kwargs).data
+                    cache.set(key, data, CATALOG_CACHE_TIMEOUT)
+                response = Response(data)
+        for header, value in headers.items():
+            response[header] = value
+        return response
+
+    def get_precompressed_response(self, handler, request, version,
+                                   *args, **kwargs):
+        """Отдает заранее сериализованный и сжатый полный список."""
+        key = get_request_cache_key(f'catalog:{version}', request)
+        bodies = cache.get(key)
+        if bodies is None:
+            content = json.dumps(
+                handler(request, *args, **kwargs).data,
+                ensure_ascii=False,
+                separators=(',', ':'),
+            ).encode()
+            bodies = (content, gzip.compress(content))
+            cache.set(key, bodies, CATALOG_CACHE_TIMEOUT)
+        content, compressed = bodies
+        accepts_gzip = 'gzip' in request.META.get('HTTP_ACCEPT_ENCODING', '')
+        response = HttpResponse(
+            compressed if accepts_gzip else content,
+            content_type='application/json',
+        )
+        if accepts_gzip:
+            response['Content-Encoding'] = 'gzip'
+        patch_vary_headers(response, ('Accept-Encoding',))
+        return response
+
+
+class AnonymousCacheMixin:
+    """Кеширование ответов анонимным пользователям.
+
+    Вместе с ответом хранятся версии данных, из которых он собран.
+    Ответ берется из кеша, только если ни одна из версий не изменилась.
+    """
+
+    cache_version_keys = ()
+
+    def list(self, request, *args, **kwargs):
+        return self.get_anonymous_response(
+            super().list, request, *args, **kwargs
+        )
+
+    def retrieve(self, request, *args, **kwargs):
+        return self.get_anonymous_response(
+            super().retrieve, request, *args, **kwargs
+        )
+
+    def get_cache_dependencies(self, data):
+        """Возвращает ключи версий объектов, попавших в ответ."""
+        return ()
+
+    def get_anonymous_response(self, handler, request, *args, **kwargs):
+        """Возвращает ответ из кеша, если его данные не изменились."""
+        if not request.user.is_anonymous:
+            return handler(request, *args, **kwargs)
+        key = get_request_cache_key('anonymous', request)
+        entry = cache.get(key)
+        if entry is not None:
+            versions, data = entry
+            if get_versions(tuple(versions)) == versions:
+                return Response(data)
+        versions = get_versions(self.cache_version_keys)
+        response = handler(request, *args, **kwargs)
+        if response.status_code == status.HTTP_200_OK:
+            versions.update(get_versions(
+                tuple(self.get_cache_dependencies(response.data))
+            ))
+            cache.set(key, (versions, response.data), ANONYMOUS_CACHE_TIMEOUT)
+        return response
+
+
+class SerializationMetricsMixin:
+    """Учет времени работы сериализатора в метриках запроса."""
+
+    def to_representation(self, instance):
+        with measure_serialization():
+            return super().to_representation(instance)
@@ -0,0 +1,32 @@
+from django.db import models
+
+
+class CounterFieldsModel(models.Model):
+    """Модель с денормализованными счетчиками.
+
+    Счетчики меняются только атомарными UPDATE, поэтому полное
+    сохранение существующей записи их не записывает: иначе устаревший
+    экземпляр затер бы изменения, сделанные другими запросами.
+    """
+
+    counter_fields = ()
+
+    class Meta:
+        abstract = True
+
+    def save(self, force_insert=False, force_update=False, using=None,
+             update_fields=None):
+        if update_fields is None and not force_insert and (
+            not self._state.adding
+        ):
+            skipped = self.get_deferred_fields().union(self.counter_fields)
+            update_fields = [
+                field.name for field in self._meta.concrete_fields
+                if not field.primary_key and field.attname not in skipped
+            ]
+        super().save(
+            force_insert=force_insert,
+            force_update=force_update,
+            using=using,
+            update_fields=update_fields,
+        )
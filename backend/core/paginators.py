@@ -1,8 +1,135 @@
-from rest_framework.pagination import PageNumberPagination
+from base64 import b64decode, b64encode
+from binascii import Error as DecodeError
+
+from django.utils.dateparse import parse_datetime
+from rest_framework.exceptions import NotFound, ValidationError
+from rest_framework.pagination import (
+    BasePagination,
+    CursorPagination,
+    PageNumberPagination,
+)
+from rest_framework.response import Response
+from rest_framework.utils.urls import replace_query_param
+
+
+class KeysetPagination(CursorPagination):
+    """Класс курсорной пагинации без подсчета количества объектов."""
+
+    page_size_query_param = 'limit'
+    page_size = 6
+    ordering = ('-pub_date', '-id')
+
+    def get_ordering(self, request, queryset, view):
+        """Возвращает порядок курсора, заданный во вьюсете."""
+        return getattr(view, 'cursor_ordering', self.ordering)
 
 
 class Pagination(PageNumberPagination):
-    """Класс настраиваемой пагинации."""
+    """Класс настраиваемой пагинации.
+
+    Вьюсеты с атрибутом cursor_ordering при наличии параметра cursor
+    в запросе переключаются на курсорную пагинацию. Курсор задает свой
+    порядок, поэтому с другой сортировкой, например по рейтингу или
+    релевантности поиска, запрос отклоняется.
+    """
+
+    invalid_ordering_message = (
+        'Курсорная пагинация не поддерживает выбранную сортировку.'
+    )
 
     page_size_query_param = 'limit'
     page_size = 6
+    keyset_paginator = None
+
+    def paginate_queryset(self, queryset, request, view=None):
+        if (
+            getattr(view, 'cursor_ordering', None)
+            and KeysetPagination.cursor_query_param in request.query_params
+        ):
+            ordering = queryset.query.order_by
+            if ordering and tuple(ordering) != tuple(view.cursor_ordering):
+                raise ValidationError({
+                    KeysetPagination.cursor_query_param:
+                        self.invalid_ordering_message,
+                })
+            self.keyset_paginator = KeysetPagination()
+            return self.keyset_paginator.paginate_queryset(
+                queryset, request, view
+            )
+        return super().paginate_queryset(queryset, request, view)
+
+    def get_paginated_response(self, data):
+        if self.keyset_paginator is not None:
+            return self.keyset_paginator.get_paginated_response(data)
+        return super().get_paginated_response(data)
+
+
+class FeedPagination(BasePagination):
+    """Класс курсорной пагинации ленты подписок.
+
+    Курсор хранит дату публикации и id последнего рецепта страницы,
+    следующая страница читается с этой позиции по индексу ленты.
+    Лента листается только вперед, ссылка previous всегда пустая.
+    """
+
+    page_size_query_param = 'limit'
+    page_size = 6
+    cursor_query_param = 'cursor'
+    invalid_cursor_message = 'Неверный курсор.'
+    next_position = None
+    request = None
+
+    def paginate_feed(self, request, get_page):
+        """Возвращает страницу, выбранную get_page(position, size).
+
+        get_page возвращает объекты страницы и позицию следующей
+        страницы или None на последней странице.
+        """
+        self.request = request
+        page, self.next_position = get_page(
+            self.decode_cursor(request), self.get_page_size(request)
+        )
+        return page
+
+    def get_page_size(self, request):
+        """Возвращает размер страницы из параметра limit."""
+        try:
+            size = int(request.query_params[self.page_size_query_param])
+        except (KeyError, ValueError):
+            return self.page_size
+        return size if size > 0 else self.page_size
+
+    def decode_cursor(self, request):
+        """Возвращает позицию из курсора запроса или None."""
+        encoded = request.query_params.get(self.cursor_query_param)
+        if not encoded:
+            return None
+        try:
+            pub_date, pk = b64decode(
+                encoded.encode(), validate=True
+            ).decode().split(' ')
+            position = parse_datetime(pub_date), int(pk)
+        except (DecodeError, UnicodeDecodeError, ValueError):
+            raise NotFound(self.invalid_cursor_message)
+        if position[0] is None:
+            raise NotFound(self.invalid_cursor_message)
+        return position
+
+    def encode_cursor(self, position):
+        """Возвращает ссылку на страницу с позиции position."""
+        pub_date, pk = position
+        return replace_query_param(
+            self.request.build_absolute_uri(),
+            self.cursor_query_param,
+            b64encode(f'{pub_date.isoformat()} {pk}'.encode()).decode(),
+        )
+
+    def get_paginated_response(self, data):
+        return Response({
+            'next': (
+                None if self.next_position is None
+                else self.encode_cursor(self.next_position)
+            ),
+            'previous': None,
+            'results': data,
+        })
@@ -0,0 +1,11 @@
+from django.db.backends.signals import connection_created
+from django.dispatch import receiver
+
+from core.metrics import count_query
+
+
+@receiver(connection_created)
+def add_query_counter(sender, connection, **kwargs):
+    """Подключает счетчик SQL запросов метрик к новому соединению."""
+    if count_query not in connection.execute_wrappers:
+        connection.execute_wrappers.append(count_query)
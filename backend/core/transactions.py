@@ -0,0 +1,27 @@
+from django.db import connection, transaction
+
+
+def on_commit_once(name, values, func):
+    """Вызывает func один раз после фиксации текущей транзакции.
+
+    Значения, переданные под одним именем до фиксации, копятся
+    в одном множестве, и func получает их одним вызовом. Повторные
+    сохранения одной записи не ставят одну и ту же работу дважды.
+    Вне транзакции func вызывается сразу.
+    """
+    pending = connection.__dict__.setdefault('pending_on_commit', {})
+    callback = pending.get(name)
+    if callback is not None and any(
+        callback is registered for _, registered in connection.run_on_commit
+    ):
+        callback.values.update(values)
+        return
+
+    def callback():
+        if pending.get(name) is callback:
+            del pending[name]
+        func(callback.values)
+
+    callback.values = set(values)
+    pending[name] = callback
+    transaction.on_commit(callback)
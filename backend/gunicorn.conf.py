@@ -0,0 +1,56 @@
+import os
+import shutil
+
+bind = '0.0.0.0:8000'
+
+workers = int(os.getenv('GUNICORN_WORKERS', 1))
+
+# Каталог файлов метрик Prometheus, общих для всех процессов.
+metrics_dir = os.getenv('PROMETHEUS_MULTIPROC_DIR')
+
+# Режим ASGI: представления чтения API выполняются параллельно в пуле
+# потоков каждого процесса, размер пула задает ASGI_THREADS.
+if os.getenv('SERVER_MODE', 'wsgi') == 'asgi':
+    wsgi_app = 'foodgram.asgi:application'
+    worker_class = 'uvicorn.workers.UvicornWorker'
+else:
+    wsgi_app = 'foodgram.wsgi:application'
+
+
+def on_starting(server):
+    """Проверяет кеш и очищает каталог метрик перед запуском процессов.
+
+    Версии данных и токены в LocMemCache видны только своему процессу,
+    поэтому изменения в одном процессе не сбрасывали бы кеш остальных.
+    Файлы метрик прошлого запуска удаляются, чтобы не попасть в сумму.
+    """
+    os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'foodgram.settings')
+    from django.conf import settings
+
+    backend = settings.CACHES['default']['BACKEND']
+    if workers > 1 and backend.endswith('.LocMemCache'):
+        raise RuntimeError(
+            f'GUNICORN_WORKERS={workers} требует общий кеш процессов: '
+            'задайте DJANGO_CACHE_BACKEND, например FileBasedCache.'
+        )
+    if metrics_dir:
+        shutil.rmtree(metrics_dir, ignore_errors=True)
+        os.makedirs(metrics_dir)
+
+
+def child_exit(server, worker):
+    """Удаляет метрики текущего состояния остановленного процесса."""
+    if metrics_dir:
+        from prometheus_client import multiprocess
+
+        multiprocess.mark_process_dead(worker.pid)
+
+
+def worker_exit(server, worker):
+    """Закрывает соединения с базой данных остановленного процесса."""
+    from django.db import connections
+
+    from core.backends.postgresql.pool import close_pools
+
+    connections.close_all()
+    close_pools()
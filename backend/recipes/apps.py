@@ -7,3 +7,7 @@ class RecipesConfig(AppConfig):
     default_auto_field = 'django.db.models.BigAutoField'
     name = 'recipes'
     verbose_name = 'Рецепты'
+
+    def ready(self):
+        """Подключает обработчики сигналов счетчиков."""
+        from recipes import signals  # noqa: F401
@@ -0,0 +1,114 @@
+import heapq
+from itertools import islice
+
+from django.db.models import Exists, OuterRef, Q
+
+from core.consts import FEED_BATCH_SIZE, FEED_FANOUT_LIMIT
+from recipes.models import FeedEntry, Recipe
+from users.models import Follow
+
+
+def create_entries(entries):
+    """Сохраняет записи ленты пачками, пропуская существующие."""
+    entries = iter(entries)
+    while True:
+        batch = list(islice(entries, FEED_BATCH_SIZE))
+        if not batch:
+            return
+        FeedEntry.objects.bulk_create(batch, ignore_conflicts=True)
+
+
+def fan_out_recipes(recipes):
+    """Добавляет новые рецепты в ленты подписчиков их авторов.
+
+    Рецепты авторов с числом подписчиков больше FEED_FANOUT_LIMIT
+    не раскладываются по лентам и читаются из подписок при запросе.
+    """
+    author_recipes = {}
+    for recipe in recipes:
+        author_recipes.setdefault(recipe.author_id, []).append(recipe)
+    followers = Follow.objects.filter(
+        following__in=author_recipes,
+        following__followers_count__lte=FEED_FANOUT_LIMIT,
+    ).values_list('user_id', 'following_id')
+    create_entries(
+        FeedEntry(
+            user_id=user_id,
+            recipe_id=recipe.pk,
+            author_id=author_id,
+            pub_date=recipe.pub_date,
+        )
+        for user_id, author_id in followers.iterator()
+        for recipe in author_recipes[author_id]
+    )
+
+
+def fill_feed(user_id, author_id):
+    """Добавляет рецепты автора в ленту нового подписчика."""
+    recipes = Recipe.objects.filter(
+        author_id=author_id,
+        author__followers_count__lte=FEED_FANOUT_LIMIT,
+    ).values_list('pk', 'pub_date')
+    create_entries(
+        FeedEntry(
+            user_id=user_id,
+            recipe_id=recipe_id,
+            author_id=author_id,
+            pub_date=pub_date,
+        )
+        for recipe_id, pub_date in recipes.iterator()
+    )
+
+
+def clear_feed(user_id, author_id):
+    """Удаляет рецепты автора из ленты отписавшегося пользователя."""
+    FeedEntry.objects.filter(user_id=user_id, author_id=author_id).delete()
+
+
+def get_feed_page(user, position, size, tags=()):
+    """Возвращает id рецептов страницы ленты и позицию следующей.
+
+    position - дата публикации и id последнего рецепта прошлой
+    страницы. Записи ленты читаются по индексу с этой позиции. Рецепты
+    авторов, которые не раскладываются по лентам из-за большого числа
+    подписчиков, выбираются для того же окна и сливаются с записями
+    по дате публикации. На последней странице позиция следующей None.
+    """
+    entries = FeedEntry.objects.filter(user=user)
+    recipes = Recipe.objects.filter(author__in=Follow.objects.filter(
+        user=user,
+        following__followers_count__gt=FEED_FANOUT_LIMIT,
+    ).values('following_id'))
+    if position is not None:
+        pub_date, pk = position
+        entries = entries.filter(
+            Q(pub_date__lt=pub_date) | Q(pub_date=pub_date, recipe_id__lt=pk)
+        )
+        recipes = recipes.filter(
+            Q(pub_date__lt=pub_date) | Q(pub_date=pub_date, pk__lt=pk)
+        )
+    if tags:
+        tagged = Recipe.tags.through.objects.filter(tag__slug__in=tags)
+        entries = entries.filter(
+            Exists(tagged.filter(recipe=OuterRef('recipe_id')))
+        )
+        recipes = recipes.filter(Exists(tagged.filter(recipe=OuterRef('pk'))))
+    window = heapq.merge(
+        entries.order_by(
+            '-pub_date', '-recipe_id'
+        ).values_list('pub_date', 'recipe_id')[:size + 1],
+        recipes.order_by(
+            '-pub_date', '-pk'
+        ).values_list('pub_date', 'pk')[:size + 1],
+        reverse=True,
+    )
+    page = []
+    for item in window:
+        # Рецепт автора, набравшего подписчиков после раскладки,
+        # может прийти из обоих источников.
+        if page and page[-1] == item:
+            continue
+        page.append(item)
+        if len(page) > size:
+            return [pk for _, pk in page[:size]], page[size - 1]
+    return [pk for _, pk in page], None
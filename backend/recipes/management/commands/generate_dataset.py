@@ -0,0 +1,259 @@
+import os
+import random
+from datetime import timedelta
+from itertools import accumulate
+
+from django.conf import settings
+from django.contrib.auth.hashers import make_password
+from django.core.management import BaseCommand, CommandError, call_command
+from django.db import connection, transaction
+from django.db.models import Max
+from django.utils import timezone
+from PIL import Image
+
+from core.caches import (
+    RECIPES_VERSION_KEY,
+    bump_catalog_version,
+    bump_version,
+)
+from recipes.models import (
+    Favorite,
+    Ingredient,
+    Recipe,
+    RecipeIngredient,
+    ShoppingCart,
+    Tag,
+)
+from recipes.search import index_recipes
+from users.models import Follow, User
+
+DEFAULT_BATCH_SIZE = 1000
+
+IMAGE_NAME = 'recipes/images/synthetic.png'
+
+PASSWORD = 'synthetic-password'
+
+# Показатель распределения Ципфа: небольшая часть авторов, рецептов
+# и ингредиентов собирает большую часть подписок, избранного и
+# упоминаний в рецептах, как в живых данных.
+ZIPF_EXPONENT = 1.1
+
+
+class Command(BaseCommand):
+    """Генерация синтетических данных для нагрузочных замеров."""
+
+    help = (
+        'Создает пользователей, рецепты, избранное, списки покупок и '
+        'подписки. Теги и ингредиенты берутся из справочников, при '
+        'пустых справочниках они загружаются из data/*.csv. Пароль '
+        f'всех созданных пользователей - {PASSWORD}.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--users', type=int, default=1000)
+        parser.add_argument('--recipes', type=int, default=5000)
+        parser.add_argument('--favorites', type=int, default=20000)
+        parser.add_argument('--carts', type=int, default=5000)
+        parser.add_argument('--follows', type=int, default=10000)
+        parser.add_argument(
+            '--seed',
+            type=int,
+            default=0,
+            help='Начальное значение генератора случайных чисел.',
+        )
+        parser.add_argument(
+            '--batch-size',
+            type=int,
+            default=DEFAULT_BATCH_SIZE,
+            help='Количество объектов в одном запросе bulk_create.',
+        )
+
+    def handle(self, *args, **options):
+        """Создает набор данных и пересчитывает производные данные."""
+        if options['batch_size'] < 1:
+            raise CommandError('Размер пачки должен быть больше нуля.')
+        if options['recipes'] and not options['users']:
+            raise CommandError('Для рецептов нужен хотя бы один автор.')
+        self.random = random.Random(options['seed'])
+        self.batch_size = options['batch_size']
+        if not Tag.objects.exists() or not Ingredient.objects.exists():
+            call_command('load_csv', stdout=self.stdout)
+        self.create_image()
+        user_ids = self.create_users(options['users'])
+        recipe_ids = self.create_recipes(user_ids, options['recipes'])
+        for model, count in ((Favorite, options['favorites']),
+                             (ShoppingCart, options['carts'])):
+            self.create_relations(
+                model, 'recipe_id', user_ids, recipe_ids, count
+            )
+        self.create_relations(
+            Follow, 'following_id', user_ids, user_ids, options['follows']
+        )
+        for command in ('recount_counters', 'rebuild_feed', 'refresh_scores'):
+            call_command(command, stdout=self.stdout)
+        index_recipes()
+        bump_version(RECIPES_VERSION_KEY)
+        bump_catalog_version()
+        self.stdout.write(self.style.SUCCESS(
+            f'Создано пользователей: {len(user_ids)}, '
+            f'рецептов: {len(recipe_ids)}.'
+        ))
+
+    def get_zipf_weights(self, count):
+        """Возвращает накопленные веса рангов для random.choices."""
+        return list(accumulate(
+            1 / rank ** ZIPF_EXPONENT for rank in range(1, count + 1)
+        ))
+
+    def choose_unique(self, population, weights, count):
+        """Выбирает count разных элементов с учетом весов."""
+        chosen = set()
+        while len(chosen) < min(count, len(population)):
+            chosen.update(self.random.choices(
+                population, cum_weights=weights, k=count - len(chosen)
+            ))
+        return list(chosen)[:count]
+
+    def assign_ids(self, model, objects):
+        """Назначает id заранее, если база не возвращает их из bulk_create."""
+        if connection.features.can_return_rows_from_bulk_insert:
+            return
+        last_id = model.objects.aggregate(last_id=Max('id'))['last_id'] or 0
+        for pk, obj in enumerate(objects, start=last_id + 1):
+            obj.pk = pk
+
+    def create_image(self):
+        """Создает общую картинку синтетических рецептов."""
+        path = os.path.join(settings.MEDIA_ROOT, IMAGE_NAME)
+        if not os.path.exists(path):
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+            Image.new('RGB', (960, 960), '#E66761').save(path)
+
+    def create_users(self, count):
+        """Создает пользователей с общим заранее захешированным паролем."""
+        password = make_password(PASSWORD)
+        user_ids = []
+        for start in range(0, count, self.batch_size):
+            with transaction.atomic():
+                offset = User.objects.aggregate(
+                    last_id=Max('id')
+                )['last_id'] or 0
+                users = [
+                    User(
+                        email=f'synthetic{offset + number}@example.com',
+                        username=f'synthetic{offset + number}',
+                        first_name='Синтетический',
+                        last_name=f'Пользователь {offset + number}',
+                        password=password,
+                    )
+                    for number in range(
+                        1, min(self.batch_size, count - start) + 1
+                    )
+                ]
+                self.assign_ids(User, users)
+                User.objects.bulk_create(users)
+            user_ids.extend(user.pk for user in users)
+        self.stdout.write(f'Пользователи созданы: {len(user_ids)}.')
+        return user_ids
+
+    def create_recipes(self, user_ids, count):
+        """Создает рецепты с ингредиентами и тегами.
+
+        Авторы, ингредиенты и теги выбираются по распределению Ципфа,
+        даты публикации равномерно распределены за последний год.
+        """
+        authors = self.random.sample(user_ids, len(user_ids))
+        author_weights = self.get_zipf_weights(len(authors))
+        ingredients = list(Ingredient.objects.values_list('id', 'name'))
+        self.random.shuffle(ingredients)
+        ingredient_weights = self.get_zipf_weights(len(ingredients))
+        tag_ids = list(Tag.objects.values_list('id', flat=True))
+        tag_weights = self.get_zipf_weights(len(tag_ids))
+        now = timezone.now()
+        recipe_ids = []
+        for start in range(0, count, self.batch_size):
+            recipes, relations = [], []
+            for _ in range(min(self.batch_size, count - start)):
+                recipe_ingredients = self.choose_unique(
+                    ingredients,
+                    ingredient_weights,
+                    self.random.randint(3, 12),
+                )
+                names = [name for _, name in recipe_ingredients]
+                recipes.append(Recipe(
+                    author_id=self.random.choices(
+                        authors, cum_weights=author_weights
+                    )[0],
+                    name=f'{names[0].capitalize()}, {names[1]}'[:200],
+                    text=(
+                        f'Смешать {", ".join(names)}. '
+                        'Готовить до готовности и подавать горячим.'
+                    ),
+                    cooking_time=self.random.randint(5, 180),
+                    image=IMAGE_NAME,
+                ))
+                relations.append((
+                    self.choose_unique(
+                        tag_ids, tag_weights, self.random.randint(1, 3)
+                    ),
+                    [pk for pk, _ in recipe_ingredients],
+                ))
+            with transaction.atomic():
+                self.assign_ids(Recipe, recipes)
+                Recipe.objects.bulk_create(recipes)
+                for recipe in recipes:
+                    recipe.pub_date = now - timedelta(
+                        seconds=self.random.randint(0, 365 * 24 * 60 * 60)
+                    )
+                Recipe.objects.bulk_update(recipes, ('pub_date',))
+                Recipe.tags.through.objects.bulk_create(
+                    Recipe.tags.through(recipe_id=recipe.pk, tag_id=tag_id)
+                    for recipe, (tags, _) in zip(recipes, relations)
+                    for tag_id in tags
+                )
+                RecipeIngredient.objects.bulk_create(
+                    RecipeIngredient(
+                        recipe_id=recipe.pk,
+                        ingredient_id=ingredient_id,
+                        amount=self.random.randint(1, 500),
+                    )
+                    for recipe, (_, ingredient_ids) in zip(recipes, relations)
+                    for ingredient_id in ingredient_ids
+                )
+            recipe_ids.extend(recipe.pk for recipe in recipes)
+        self.stdout.write(f'Рецепты созданы: {len(recipe_ids)}.')
+        return recipe_ids
+
+    def create_relations(self, model, target_field, user_ids, target_ids,
+                         count):
+        """Создает связи пользователей с популярными объектами.
+
+        Пользователи выбираются равномерно, объекты - по распределению
+        Ципфа. Повторные пары и подписки на себя пропускаются.
+        """
+        if not user_ids or not target_ids:
+            return
+        targets = self.random.sample(target_ids, len(target_ids))
+        weights = self.get_zipf_weights(len(targets))
+        pairs = set()
+        attempts = 0
+        while len(pairs) < count and attempts < count * 10:
+            attempts += 1
+            user_id = self.random.choice(user_ids)
+            target_id = self.random.choices(targets, cum_weights=weights)[0]
+            if model is not Follow or user_id != target_id:
+                pairs.add((user_id, target_id))
+        pairs = list(pairs)
+        for start in range(0, len(pairs), self.batch_size):
+            model.objects.bulk_create(
+                (
+                    model(user_id=user_id, **{target_field: target_id})
+                    for user_id, target_id in pairs[
+                        start:start + self.batch_size
+                    ]
+                ),
+                ignore_conflicts=True,
+            )
+        self.stdout.write(
+            f'{model._meta.verbose_name_plural} созданы: {len(pairs)}.'
+        )
@@ -0,0 +1,41 @@
+from django.core.management import BaseCommand
+
+from recipes.models import Recipe
+from recipes.renditions import generate_renditions
+
+
+class Command(BaseCommand):
+    """Создание уменьшенных копий картинок рецептов."""
+
+    help = 'Создает уменьшенные копии картинок рецептов.'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--all',
+            action='store_true',
+            help='Пересоздать копии для всех рецептов.',
+        )
+
+    def handle(self, *args, **options):
+        """Создает копии для рецептов без актуальных копий."""
+        recipes = Recipe.objects.exclude(image='').only(
+            'image', 'image_renditions'
+        )
+        created = 0
+        for recipe in recipes.iterator():
+            if (
+                options['all']
+                or recipe.image_renditions.get('source') != recipe.image.name
+            ):
+                try:
+                    generate_renditions(recipe.pk)
+                except OSError as e:
+                    self.stdout.write(self.style.ERROR(
+                        f'Не удалось создать копии для рецепта {recipe.pk}. '
+                        f'Ошибка: {str(e)}'
+                    ))
+                    continue
+                created += 1
+        self.stdout.write(self.style.SUCCESS(
+            f'Копии картинок созданы для {created} рецептов.'
+        ))
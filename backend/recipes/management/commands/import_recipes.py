@@ -0,0 +1,229 @@
+import csv
+import json
+import os
+import time
+from collections import Counter
+from itertools import islice
+
+from django.core.exceptions import ValidationError
+from django.core.management import BaseCommand, CommandError
+from django.db import connection, transaction
+from django.db.models import Max
+
+from core.caches import RECIPES_VERSION_KEY, bump_version
+from core.consts import MAX_VALUE_VALIDATOR, MIN_VALUE_VALIDATOR
+from core.counters import change_counter
+from recipes.feed import fan_out_recipes
+from recipes.models import (
+    Ingredient,
+    Recipe,
+    RecipeIngredient,
+    RecipeScore,
+    Tag,
+)
+from recipes.search import index_recipes
+from users.models import User
+
+DEFAULT_BATCH_SIZE = 1000
+
+LIST_FIELDS = ('tags', 'ingredients')
+
+
+class Command(BaseCommand):
+    """Массовый импорт рецептов из NDJSON или CSV."""
+
+    help = (
+        'Импортирует рецепты из NDJSON или CSV файла пачками. '
+        'Каждая запись содержит author (email), name, text, cooking_time, '
+        'image (путь внутри MEDIA_ROOT), tags (список слагов) и '
+        'ingredients (список объектов name, measurement_unit, amount). '
+        'В CSV списки tags и ingredients записываются в формате JSON.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('path', help='Путь к файлу с рецептами.')
+        parser.add_argument(
+            '--format',
+            choices=('ndjson', 'csv'),
+            help='Формат файла. По умолчанию определяется по расширению.',
+        )
+        parser.add_argument(
+            '--batch-size',
+            type=int,
+            default=DEFAULT_BATCH_SIZE,
+            help='Количество рецептов в одной пачке.',
+        )
+        parser.add_argument(
+            '--resume',
+            action='store_true',
+            help='Продолжить импорт с последней сохраненной пачки.',
+        )
+
+    def handle(self, *args, **options):
+        """Импортирует рецепты и сообщает о скорости загрузки."""
+        path = options['path']
+        if not os.path.exists(path):
+            raise CommandError(f'Файл {path} не найден.')
+        if options['batch_size'] < 1:
+            raise CommandError('Размер пачки должен быть больше нуля.')
+        file_format = options['format'] or (
+            'csv' if path.lower().endswith('.csv') else 'ndjson'
+        )
+        checkpoint_path = f'{path}.checkpoint'
+        processed = 0
+        if options['resume'] and os.path.exists(checkpoint_path):
+            with open(checkpoint_path, encoding='utf-8') as checkpoint:
+                processed = int(checkpoint.read() or 0)
+            self.stdout.write(f'Продолжение импорта с записи {processed}.')
+        self.load_lookups()
+        imported = skipped = 0
+        started = time.monotonic()
+        with open(path, encoding='utf-8', newline='') as file:
+            records = islice(
+                self.read_records(file, file_format), processed, None
+            )
+            while True:
+                batch = list(islice(records, options['batch_size']))
+                if not batch:
+                    break
+                created, errors = self.import_batch(batch)
+                imported += created
+                skipped += len(errors)
+                for line, error in errors:
+                    self.stdout.write(self.style.WARNING(
+                        f'Запись {line} пропущена: {error}'
+                    ))
+                processed += len(batch)
+                with open(
+                    checkpoint_path, 'w', encoding='utf-8'
+                ) as checkpoint:
+                    checkpoint.write(str(processed))
+                elapsed = time.monotonic() - started
+                self.stdout.write(
+                    f'Обработано {processed}, загружено {imported}, '
+                    f'{imported / elapsed:.0f} рецептов/с.'
+                )
+        if os.path.exists(checkpoint_path):
+            os.remove(checkpoint_path)
+        if imported:
+            bump_version(RECIPES_VERSION_KEY)
+        elapsed = time.monotonic() - started
+        self.stdout.write(self.style.SUCCESS(
+            f'Импорт завершен: загружено {imported}, пропущено {skipped} '
+            f'за {elapsed:.1f} с. Для создания копий картинок выполните '
+            'команду generate_renditions.'
+        ))
+
+    def load_lookups(self):
+        """Загружает словари авторов, тегов и ингредиентов в память."""
+        self.authors = dict(User.objects.values_list('email', 'id'))
+        self.tags = dict(Tag.objects.values_list('slug', 'id'))
+        self.ingredients = {
+            (name, measurement_unit): pk
+            for pk, name, measurement_unit in Ingredient.objects.values_list(
+                'id', 'name', 'measurement_unit'
+            )
+        }
+
+    @staticmethod
+    def read_records(file, file_format):
+        """Построчно читает записи файла."""
+        if file_format == 'csv':
+            for line, row in enumerate(csv.DictReader(file), start=2):
+                try:
+                    for field in LIST_FIELDS:
+                        row[field] = json.loads(row.get(field) or '[]')
+                except json.JSONDecodeError as e:
+                    row = {'error': f'некорректный JSON: {e}'}
+                yield line, row
+            return
+        for line, text in enumerate(file, start=1):
+            if not text.strip():
+                continue
+            try:
+                yield line, json.loads(text)
+            except json.JSONDecodeError as e:
+                yield line, {'error': f'некорректный JSON: {e}'}
+
+    def build_recipe(self, record):
+        """Проверяет запись и возвращает рецепт, теги и ингредиенты."""
+        if 'error' in record:
+            raise ValueError(record['error'])
+        author_id = self.authors.get(record.get('author'))
+        if author_id is None:
+            raise ValueError(f'автор {record.get("author")} не найден')
+        tag_ids = []
+        for slug in record.get('tags') or ():
+            if slug not in self.tags:
+                raise ValueError(f'тег {slug} не найден')
+            tag_ids.append(self.tags[slug])
+        amounts = {}
+        for item in record.get('ingredients') or ():
+            key = (item.get('name'), item.get('measurement_unit'))
+            if key not in self.ingredients:
+                raise ValueError(f'ингредиент {key[0]} ({key[1]}) не найден')
+            if self.ingredients[key] in amounts:
+                raise ValueError(f'ингредиент {key[0]} повторяется')
+            amount = int(item['amount'])
+            if not MIN_VALUE_VALIDATOR <= amount <= MAX_VALUE_VALIDATOR:
+                raise ValueError(f'количество {key[0]} вне диапазона')
+            amounts[self.ingredients[key]] = amount
+        if not tag_ids or not amounts:
+            raise ValueError('рецепт без тегов или ингредиентов')
+        recipe = Recipe(
+            author_id=author_id,
+            name=record['name'],
+            text=record['text'],
+            cooking_time=int(record['cooking_time']),
+            image=record['image'],
+        )
+        recipe.clean_fields(exclude=('author', 'image'))
+        return recipe, set(tag_ids), amounts
+
+    @transaction.atomic
+    def import_batch(self, batch):
+        """Сохраняет пачку рецептов несколькими запросами bulk_create."""
+        recipes, relations, errors = [], [], []
+        for line, record in batch:
+            try:
+                recipe, tag_ids, amounts = self.build_recipe(record)
+            except (KeyError, TypeError, ValueError, ValidationError) as e:
+                errors.append((line, str(e)))
+                continue
+            recipes.append(recipe)
+            relations.append((tag_ids, amounts))
+        if not recipes:
+            return 0, errors
+        if not connection.features.can_return_rows_from_bulk_insert:
+            # SQLite не возвращает id из bulk_create, поэтому они
+            # назначаются заранее внутри транзакции пачки.
+            last_id = Recipe.objects.aggregate(
+                last_id=Max('id')
+            )['last_id'] or 0
+            for pk, recipe in enumerate(recipes, start=last_id + 1):
+                recipe.pk = pk
+        Recipe.objects.bulk_create(recipes)
+        Recipe.tags.through.objects.bulk_create(
+            Recipe.tags.through(recipe_id=recipe.pk, tag_id=tag_id)
+            for recipe, (tag_ids, _) in zip(recipes, relations)
+            for tag_id in tag_ids
+        )
+        RecipeIngredient.objects.bulk_create(
+            RecipeIngredient(
+                recipe_id=recipe.pk,
+                ingredient_id=ingredient_id,
+                amount=amount,
+            )
+            for recipe, (_, amounts) in zip(recipes, relations)
+            for ingredient_id, amount in amounts.items()
+        )
+        for author_id, count in Counter(
+            recipe.author_id for recipe in recipes
+        ).items():
+            change_counter(User, 'recipes_count', count, pk=author_id)
+        RecipeScore.objects.bulk_create(
+            RecipeScore(recipe_id=recipe.pk) for recipe in recipes
+        )
+        fan_out_recipes(recipes)
+        index_recipes(recipe.pk for recipe in recipes)
+        return len(recipes), errors
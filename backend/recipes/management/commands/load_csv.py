@@ -1,32 +1,58 @@
 import csv
 import os
+from itertools import islice
 
 from django.conf import settings
-from django.core.management import BaseCommand
+from django.core.management import BaseCommand, CommandError
+from django.db import transaction
 
+from core.caches import bump_catalog_version
 from recipes.models import Ingredient, Tag
 
 CSV_ITEMS = {
     'ingredients': {
         'file': 'ingredients.csv',
         'model': Ingredient,
-        'fields': ('name', 'measurement_unit')
+        'fields': ('name', 'measurement_unit'),
+        'key': ('name', 'measurement_unit'),
     },
     'tags': {
         'file': 'tags.csv',
         'model': Tag,
-        'fields': ('name', 'color', 'slug')
+        'fields': ('name', 'color', 'slug'),
+        'key': ('slug',),
     },
 }
 
+DEFAULT_BATCH_SIZE = 1000
+
 
 class Command(BaseCommand):
     """Загрузка ингредиентов из CSV."""
 
-    help = 'Загрузка ингредиентов и тегов из CSV файла.'
+    help = (
+        'Загрузка ингредиентов и тегов из CSV файла. Повторный запуск '
+        'добавляет новые записи и обновляет измененные.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--batch-size',
+            type=int,
+            default=DEFAULT_BATCH_SIZE,
+            help='Количество строк, обрабатываемых за один раз.',
+        )
+        parser.add_argument(
+            '--dry-run',
+            action='store_true',
+            help='Посчитать изменения без записи в базу данных.',
+        )
 
-    def handle(self, *args, **kwargs):
+    def handle(self, *args, **options):
         """Загружает ингредиенты и теги из CSV файла."""
+        if options['batch_size'] < 1:
+            raise CommandError('Размер пачки должен быть больше нуля.')
+        changed = False
         for model_name, model_info in CSV_ITEMS.items():
             csv_file_path = os.path.join(
                 settings.BASE_DIR,
@@ -35,21 +61,66 @@ class Command(BaseCommand):
             try:
                 with open(csv_file_path, 'r', encoding='utf-8') as file:
                     reader = csv.reader(file)
-                    items_to_create = [
-                        model_info['model'](
-                            **dict(zip(model_info['fields'], row))
+                    totals = {'inserted': 0, 'updated': 0, 'skipped': 0}
+                    while True:
+                        rows = list(islice(reader, options['batch_size']))
+                        if not rows:
+                            break
+                        counts = self.upsert(
+                            model_info, rows, options['dry_run']
                         )
-                        for row in reader
-                    ]
-                    model_info['model'].objects.bulk_create(items_to_create)
-                    self.stdout.write(self.style.SUCCESS(
-                        f'Загрузка всех {model_name} выполнена.'
-                    ))
+                        for name, count in counts.items():
+                            totals[name] += count
             except FileNotFoundError as e:
                 self.stdout.write(self.style.ERROR(
                     f'Файл {csv_file_path} не найден. Проверьте путь к файлу. '
                     f'Ошибка: {str(e)}'))
-            except Exception as e:
-                self.stdout.write(self.style.ERROR(
-                    f'Произошла ошибка: {str(e)}'
-                ))
+                continue
+            changed = changed or totals['inserted'] or totals['updated']
+            self.stdout.write(self.style.SUCCESS(
+                f'Загрузка всех {model_name} выполнена'
+                f'{" (пробный запуск)" if options["dry_run"] else ""}: '
+                f'добавлено {totals["inserted"]}, '
+                f'обновлено {totals["updated"]}, '
+                f'пропущено {totals["skipped"]}.'
+            ))
+        if changed and not options['dry_run']:
+            bump_catalog_version()
+
+    @staticmethod
+    @transaction.atomic
+    def upsert(model_info, rows, dry_run):
+        """Добавляет новые и обновляет измененные записи пачки."""
+        model, fields, key = (
+            model_info['model'], model_info['fields'], model_info['key']
+        )
+        items = {}
+        for row in rows:
+            item = dict(zip(fields, row))
+            items[tuple(item[field] for field in key)] = item
+        existing = {
+            tuple(getattr(obj, field) for field in key): obj
+            for obj in model.objects.filter(**{
+                f'{key[0]}__in': {item_key[0] for item_key in items}
+            })
+        }
+        to_create, to_update = [], []
+        update_fields = tuple(set(fields) - set(key))
+        for item_key, item in items.items():
+            obj = existing.get(item_key)
+            if obj is None:
+                to_create.append(model(**item))
+            elif any(getattr(obj, field) != item[field]
+                     for field in update_fields):
+                for field in update_fields:
+                    setattr(obj, field, item[field])
+                to_update.append(obj)
+        if not dry_run:
+            model.objects.bulk_create(to_create, ignore_conflicts=True)
+            if to_update:
+                model.objects.bulk_update(to_update, update_fields)
+        return {
+            'inserted': len(to_create),
+            'updated': len(to_update),
+            'skipped': len(rows) - len(to_create) - len(to_update),
+        }
@@ -0,0 +1,44 @@
+from django.core.management import BaseCommand
+from django.db import transaction
+
+from core.consts import FEED_FANOUT_LIMIT
+from recipes.feed import create_entries
+from recipes.models import FeedEntry
+from users.models import Follow
+
+
+class Command(BaseCommand):
+    """Пересборка лент подписок."""
+
+    help = (
+        'Заново заполняет ленты подписок по подпискам и рецептам. '
+        'Нужна после первого развертывания ленты и изменения '
+        'FEED_FANOUT_LIMIT.'
+    )
+
+    @transaction.atomic
+    def handle(self, *args, **kwargs):
+        """Удаляет все записи лент и создает их заново."""
+        FeedEntry.objects.all().delete()
+        entries = Follow.objects.filter(
+            following__followers_count__lte=FEED_FANOUT_LIMIT,
+            following__recipes__isnull=False,
+        ).values_list(
+            'user_id',
+            'following_id',
+            'following__recipes',
+            'following__recipes__pub_date',
+        )
+        create_entries(
+            FeedEntry(
+                user_id=user_id,
+                recipe_id=recipe_id,
+                author_id=author_id,
+                pub_date=pub_date,
+            )
+            for user_id, author_id, recipe_id, pub_date in entries.iterator()
+        )
+        self.stdout.write(self.style.SUCCESS(
+            f'Ленты подписок заполнены: '
+            f'{FeedEntry.objects.count()} записей.'
+        ))
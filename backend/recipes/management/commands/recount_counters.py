@@ -0,0 +1,31 @@
+from django.core.management import BaseCommand
+from django.db import transaction
+
+from core.counters import recount_counter
+from recipes.models import Favorite, Recipe, ShoppingCart
+from users.models import Follow, User
+
+COUNTERS = (
+    (Recipe, 'favorites_count', Favorite, 'recipe'),
+    (Recipe, 'shopping_cart_count', ShoppingCart, 'recipe'),
+    (User, 'recipes_count', Recipe, 'author'),
+    (User, 'followers_count', Follow, 'following'),
+)
+
+
+class Command(BaseCommand):
+    """Пересчет счетчиков популярности."""
+
+    help = 'Пересчитывает счетчики рецептов и пользователей.'
+
+    @transaction.atomic
+    def handle(self, *args, **kwargs):
+        """Пересчитывает все счетчики по связанным записям."""
+        for model, field, related_model, related_field in COUNTERS:
+            updated = recount_counter(
+                model, field, related_model, related_field
+            )
+            self.stdout.write(self.style.SUCCESS(
+                f'Счетчик {model.__name__}.{field} пересчитан '
+                f'для {updated} записей.'
+            ))
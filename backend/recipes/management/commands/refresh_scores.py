@@ -0,0 +1,19 @@
+from django.core.management import BaseCommand
+
+from recipes.scores import refresh_scores
+
+
+class Command(BaseCommand):
+    """Пересчет рейтингов рецептов."""
+
+    help = (
+        'Пересчитывает популярность и набирающую популярность рецептов. '
+        'Запускается периодически, например раз в несколько минут.'
+    )
+
+    def handle(self, *args, **kwargs):
+        """Пересчитывает изменившиеся рейтинги."""
+        updated = refresh_scores()
+        self.stdout.write(self.style.SUCCESS(
+            f'Рейтинги пересчитаны для {updated} рецептов.'
+        ))
@@ -0,0 +1,51 @@
+from django.db import migrations
+
+from recipes.search import SEARCH_TABLE, index_recipes
+
+POSTGRESQL_FORWARD = (
+    'ALTER TABLE recipes_recipe '
+    'ADD COLUMN IF NOT EXISTS search_vector tsvector',
+    'CREATE INDEX IF NOT EXISTS recipes_recipe_search_vector '
+    'ON recipes_recipe USING gin (search_vector)',
+)
+POSTGRESQL_BACKWARD = (
+    'DROP INDEX IF EXISTS recipes_recipe_search_vector',
+    'ALTER TABLE recipes_recipe DROP COLUMN IF EXISTS search_vector',
+)
+SQLITE_FORWARD = (
+    f'CREATE VIRTUAL TABLE IF NOT EXISTS {SEARCH_TABLE} '
+    'USING fts5(name, ingredients, text, '
+    "tokenize='unicode61 remove_diacritics 2')",
+)
+SQLITE_BACKWARD = (
+    f'DROP TABLE IF EXISTS {SEARCH_TABLE}',
+)
+
+
+def run_sql(statements, fill=False):
+    def operation(apps, schema_editor):
+        for statement in statements.get(schema_editor.connection.vendor, ()):
+            schema_editor.execute(statement)
+        if fill:
+            index_recipes()
+    return operation
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('recipes', '0010_feed_entry'),
+    ]
+
+    operations = [
+        migrations.RunPython(
+            run_sql({
+                'postgresql': POSTGRESQL_FORWARD,
+                'sqlite': SQLITE_FORWARD,
+            }, fill=True),
+            run_sql({
+                'postgresql': POSTGRESQL_BACKWARD,
+                'sqlite': SQLITE_BACKWARD,
+            }),
+        ),
+    ]
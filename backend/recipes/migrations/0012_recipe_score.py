@@ -0,0 +1,55 @@
+# Generated by Django 3.2.23 on 2026-10-18 02:23
+
+from django.db import migrations, models
+import django.db.models.deletion
+import django.utils.timezone
+
+BATCH_SIZE = 1000
+
+
+def fill_scores(apps, schema_editor):
+    Recipe = apps.get_model('recipes', 'Recipe')
+    RecipeScore = apps.get_model('recipes', 'RecipeScore')
+    RecipeScore.objects.bulk_create(
+        (
+            RecipeScore(recipe_id=pk, popular=total, events=total)
+            for pk, total in Recipe.objects.values_list(
+                'pk',
+                models.F('favorites_count') + models.F('shopping_cart_count'),
+            ).iterator()
+        ),
+        batch_size=BATCH_SIZE,
+    )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('recipes', '0011_recipe_search_index'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='RecipeScore',
+            fields=[
+                ('recipe', models.OneToOneField(on_delete=django.db.models.deletion.CASCADE, primary_key=True, related_name='score', serialize=False, to='recipes.recipe', verbose_name='Рецепт')),
+                ('popular', models.PositiveIntegerField(default=0, verbose_name='Популярность')),
+                ('trending', models.FloatField(default=0, verbose_name='Набирающая популярность')),
+                ('events', models.PositiveIntegerField(default=0, verbose_name='Учтено добавлений')),
+                ('updated', models.DateTimeField(default=django.utils.timezone.now, verbose_name='Дата пересчета')),
+            ],
+            options={
+                'verbose_name': 'рейтинг рецепта',
+                'verbose_name_plural': 'Рейтинги рецептов',
+            },
+        ),
+        migrations.AddIndex(
+            model_name='recipescore',
+            index=models.Index(fields=['-popular', '-recipe'], name='recipes_recipescore_popular'),
+        ),
+        migrations.AddIndex(
+            model_name='recipescore',
+            index=models.Index(fields=['-trending', '-recipe'], name='recipes_recipescore_trending'),
+        ),
+        migrations.RunPython(fill_scores, migrations.RunPython.noop),
+    ]
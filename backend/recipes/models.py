@@ -1,6 +1,7 @@
 from colorfield.fields import ColorField
 from django.core.validators import MaxValueValidator, MinValueValidator
 from django.db import models
+from django.utils import timezone
 
 from core.consts import (
     LENGTH_HEX,
@@ -10,6 +11,7 @@ from core.consts import (
     MAX_VALUE_VALIDATOR_MINUTES,
     MIN_VALUE_VALIDATOR,
 )
+from core.models import CounterFieldsModel
 from users.models import User
 
 
@@ -68,7 +70,7 @@ class Ingredient(models.Model):
         return f'{self.name} - {self.measurement_unit}'
 
 
-class Recipe(models.Model):
+class Recipe(CounterFieldsModel):
     """Модель рецептов."""
 
     author = models.ForeignKey(
@@ -119,12 +121,35 @@ class Recipe(models.Model):
         verbose_name='Дата публикации',
         auto_now_add=True,
     )
+    favorites_count = models.PositiveIntegerField(
+        'Количество добавлений в избранное',
+        default=0,
+        editable=False,
+    )
+    shopping_cart_count = models.PositiveIntegerField(
+        'Количество добавлений в список покупок',
+        default=0,
+        editable=False,
+    )
+    image_renditions = models.JSONField(
+        'Уменьшенные копии картинки',
+        default=dict,
+        editable=False,
+    )
+
+    counter_fields = ('favorites_count', 'shopping_cart_count')
 
     class Meta:
         verbose_name = 'рецепт'
         verbose_name_plural = 'Рецепты'
         default_related_name = 'recipes'
         ordering = ('-pub_date',)
+        indexes = (
+            models.Index(
+                name='%(app_label)s_%(class)s_pub_date_id',
+                fields=('-pub_date', '-id'),
+            ),
+        )
 
     def __str__(self):
         return (
@@ -132,6 +157,15 @@ class Recipe(models.Model):
             f'{self.author.username} - {self.cooking_time}'
         )
 
+    def get_image_rendition(self, rendition):
+        """Возвращает путь к копии картинки или к самой картинке.
+
+        Копии используются, только если созданы из текущей картинки.
+        """
+        if self.image_renditions.get('source') == self.image.name:
+            return self.image_renditions.get(rendition, self.image.name)
+        return self.image.name
+
 
 class RecipeIngredient(models.Model):
     """Модель количества ингредиентов в рецепте."""
@@ -225,3 +259,102 @@ class ShoppingCart(UserRecipeModel):
         verbose_name = 'список покупок'
         verbose_name_plural = 'Списки покупок'
         default_related_name = 'shoppingcart'
+
+
+class FeedEntry(models.Model):
+    """Модель записи ленты подписок.
+
+    Записи создаются при публикации рецепта для каждого подписчика
+    автора, поэтому лента читается без перебора подписок. Автор и дата
+    публикации копируются из рецепта: страница ленты читается по индексу
+    записей без соединения с рецептами.
+    """
+
+    user = models.ForeignKey(
+        User,
+        verbose_name='Подписчик',
+        on_delete=models.CASCADE,
+    )
+    recipe = models.ForeignKey(
+        Recipe,
+        verbose_name='Рецепт',
+        on_delete=models.CASCADE,
+    )
+    author = models.ForeignKey(
+        User,
+        verbose_name='Автор',
+        on_delete=models.CASCADE,
+        related_name='+',
+    )
+    pub_date = models.DateTimeField(
+        verbose_name='Дата публикации',
+    )
+
+    class Meta:
+        verbose_name = 'запись ленты'
+        verbose_name_plural = 'Ленты подписок'
+        default_related_name = 'feed_entries'
+        constraints = (
+            models.UniqueConstraint(
+                name='%(app_label)s_%(class)s_unique_relationship',
+                fields=('user', 'recipe'),
+            ),
+        )
+        indexes = (
+            models.Index(
+                name='%(app_label)s_%(class)s_user_date',
+                fields=('user', '-pub_date', '-recipe'),
+            ),
+        )
+
+    def __str__(self):
+        return f'{self.user} - {self.recipe}'
+
+
+class RecipeScore(models.Model):
+    """Модель рейтинга рецепта.
+
+    Рейтинги пересчитываются периодической задачей refresh_scores
+    по счетчикам избранного и списка покупок.
+    """
+
+    recipe = models.OneToOneField(
+        Recipe,
+        verbose_name='Рецепт',
+        on_delete=models.CASCADE,
+        primary_key=True,
+        related_name='score',
+    )
+    popular = models.PositiveIntegerField(
+        'Популярность',
+        default=0,
+    )
+    trending = models.FloatField(
+        'Набирающая популярность',
+        default=0,
+    )
+    events = models.PositiveIntegerField(
+        'Учтено добавлений',
+        default=0,
+    )
+    updated = models.DateTimeField(
+        'Дата пересчета',
+        default=timezone.now,
+    )
+
+    class Meta:
+        verbose_name = 'рейтинг рецепта'
+        verbose_name_plural = 'Рейтинги рецептов'
+        indexes = (
+            models.Index(
+                name='%(app_label)s_%(class)s_popular',
+                fields=('-popular', '-recipe'),
+            ),
+            models.Index(
+                name='%(app_label)s_%(class)s_trending',
+                fields=('-trending', '-recipe'),
+            ),
+        )
+
+    def __str__(self):
+        return f'{self.recipe_id} - {self.popular} - {self.trending:.2f}'
@@ -0,0 +1,91 @@
+import logging
+import os
+from concurrent.futures import ThreadPoolExecutor
+from io import BytesIO
+
+from django.core.files.base import ContentFile
+from django.db import close_old_connections
+from PIL import Image, ImageOps
+
+from core.caches import bump_version, get_recipe_version_key
+from core.consts import (
+    IMAGE_RENDITION_FORMAT,
+    IMAGE_RENDITION_QUALITY,
+    IMAGE_RENDITIONS,
+)
+from core.transactions import on_commit_once
+from recipes.models import Recipe
+
+RENDITIONS_DIR = 'recipes/renditions/'
+
+logger = logging.getLogger(__name__)
+
+executor = ThreadPoolExecutor(
+    max_workers=1,
+    thread_name_prefix='renditions',
+)
+
+
+def generate_renditions(recipe_id):
+    """Создает уменьшенные копии изображения рецепта."""
+    recipe = Recipe.objects.filter(pk=recipe_id).only(
+        'image', 'image_renditions'
+    ).first()
+    if recipe is None or not recipe.image:
+        return
+    storage = recipe.image.storage
+    with recipe.image.open('rb') as file:
+        image = ImageOps.exif_transpose(Image.open(file)).convert('RGB')
+    name = os.path.splitext(os.path.basename(recipe.image.name))[0]
+    extension = IMAGE_RENDITION_FORMAT.lower()
+    renditions = {'source': recipe.image.name}
+    for rendition, size in IMAGE_RENDITIONS.items():
+        copy = image.copy()
+        copy.thumbnail(size)
+        buffer = BytesIO()
+        copy.save(
+            buffer,
+            IMAGE_RENDITION_FORMAT,
+            quality=IMAGE_RENDITION_QUALITY,
+        )
+        renditions[rendition] = storage.save(
+            f'{RENDITIONS_DIR}{name}_{rendition}.{extension}',
+            ContentFile(buffer.getvalue()),
+        )
+    updated = Recipe.objects.filter(
+        pk=recipe_id,
+        image=recipe.image.name,
+    ).update(image_renditions=renditions)
+    stale = recipe.image_renditions if updated else renditions
+    for rendition in IMAGE_RENDITIONS:
+        if stale.get(rendition):
+            storage.delete(stale[rendition])
+    if updated:
+        bump_version(get_recipe_version_key(recipe_id))
+
+
+def run_generate_renditions(recipe_id):
+    """Создает копии в фоновом потоке и освобождает соединение с БД."""
+    try:
+        generate_renditions(recipe_id)
+    except Exception:
+        logger.exception(
+            'Не удалось создать копии изображения рецепта %s.', recipe_id
+        )
+    finally:
+        close_old_connections()
+
+
+def submit_renditions(recipe_ids):
+    """Ставит в очередь создание копий картинок рецептов."""
+    for recipe_id in recipe_ids:
+        executor.submit(run_generate_renditions, recipe_id)
+
+
+def schedule_renditions(recipe_id):
+    """Ставит создание копий в очередь после фиксации транзакции.
+
+    Рецепт, сохраненный в транзакции несколько раз, попадает
+    в очередь один раз.
+    """
+    on_commit_once('renditions', (recipe_id,), submit_renditions)
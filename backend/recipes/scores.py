@@ -0,0 +1,65 @@
+from django.db.models import F, Q
+from django.utils import timezone
+
+from core.caches import RECIPES_VERSION_KEY, bump_version
+from core.consts import (
+    SCORE_BATCH_SIZE,
+    TRENDING_HALF_LIFE,
+    TRENDING_MIN_SCORE,
+)
+from recipes.models import Recipe, RecipeScore
+
+
+def create_missing_scores():
+    """Создает рейтинги рецептов, у которых их еще нет."""
+    recipe_ids = list(Recipe.objects.filter(
+        score__isnull=True
+    ).values_list('pk', flat=True))
+    RecipeScore.objects.bulk_create(
+        (RecipeScore(recipe_id=recipe_id) for recipe_id in recipe_ids),
+        batch_size=SCORE_BATCH_SIZE,
+        ignore_conflicts=True,
+    )
+    return len(recipe_ids)
+
+
+def refresh_scores():
+    """Пересчитывает рейтинги, изменившиеся с прошлого запуска.
+
+    Популярность равна сумме счетчиков избранного и списка покупок.
+    Набирающая популярность уменьшается вдвое за TRENDING_HALF_LIFE
+    секунд и растет на число добавлений с прошлого пересчета.
+    Рецепты без новых добавлений и с нулевым трендом не обновляются.
+    """
+    create_missing_scores()
+    now = timezone.now()
+    scores = RecipeScore.objects.annotate(
+        total=F('recipe__favorites_count') + F('recipe__shopping_cart_count')
+    ).filter(
+        Q(trending__gt=0) | ~Q(events=F('total'))
+    ).order_by('pk')
+    last_pk, updated = 0, 0
+    while True:
+        batch = list(scores.filter(pk__gt=last_pk)[:SCORE_BATCH_SIZE])
+        if not batch:
+            break
+        for score in batch:
+            decay = 0.5 ** (
+                (now - score.updated).total_seconds() / TRENDING_HALF_LIFE
+            )
+            trending = (
+                score.trending * decay + max(score.total - score.events, 0)
+            )
+            score.trending = (
+                trending if trending >= TRENDING_MIN_SCORE else 0
+            )
+            score.popular = score.events = score.total
+            score.updated = now
+        RecipeScore.objects.bulk_update(
+            batch, ('popular', 'trending', 'events', 'updated')
+        )
+        last_pk = batch[-1].pk
+        updated += len(batch)
+    if updated:
+        bump_version(RECIPES_VERSION_KEY)
+    return updated
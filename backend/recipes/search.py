@@ -0,0 +1,139 @@
+import re
+
+from django.db import connection
+from django.db.models import FloatField
+from django.db.models.expressions import RawSQL
+
+from core.caches import RECIPES_VERSION_KEY, bump_version
+from core.transactions import on_commit_once
+
+SEARCH_TABLE = 'recipes_recipe_search'
+
+WORD_PATTERN = re.compile(r'\w+')
+
+INGREDIENT_NAMES_SQL = (
+    'SELECT {aggregate} FROM recipes_recipeingredient '
+    'JOIN recipes_ingredient '
+    'ON recipes_ingredient.id = recipes_recipeingredient.ingredient_id '
+    'WHERE recipes_recipeingredient.recipe_id = recipes_recipe.id'
+)
+
+POSTGRESQL_INDEX_SQL = (
+    'UPDATE recipes_recipe SET search_vector = '
+    "setweight(to_tsvector('russian', name), 'A') || "
+    "setweight(to_tsvector('russian', coalesce(({ingredients}), '')), 'B') "
+    "|| setweight(to_tsvector('russian', text), 'C')"
+).format(ingredients=INGREDIENT_NAMES_SQL.format(
+    aggregate="string_agg(recipes_ingredient.name, ' ')"
+))
+
+SQLITE_INDEX_SQL = (
+    f'INSERT INTO {SEARCH_TABLE} (rowid, name, ingredients, text) '
+    "SELECT id, name, coalesce(({ingredients}), ''), text "
+    'FROM recipes_recipe'
+).format(ingredients=INGREDIENT_NAMES_SQL.format(
+    aggregate="group_concat(recipes_ingredient.name, ' ')"
+))
+
+# Веса полей для bm25 в порядке колонок: название, ингредиенты, текст.
+SQLITE_RANK_SQL = f'-bm25({SEARCH_TABLE}, 10.0, 4.0, 1.0)'
+
+
+def index_recipes(recipe_ids=None):
+    """Обновляет поисковый индекс рецептов.
+
+    Без списка id индекс перестраивается для всех рецептов.
+    """
+    with connection.cursor() as cursor:
+        if connection.vendor == 'postgresql':
+            if recipe_ids is None:
+                cursor.execute(POSTGRESQL_INDEX_SQL)
+            else:
+                cursor.execute(
+                    f'{POSTGRESQL_INDEX_SQL} WHERE id = ANY(%s)',
+                    (list(recipe_ids),),
+                )
+        elif connection.vendor == 'sqlite':
+            if recipe_ids is None:
+                cursor.execute(f'DELETE FROM {SEARCH_TABLE}')
+                cursor.execute(SQLITE_INDEX_SQL)
+                return
+            recipe_ids = list(recipe_ids)
+            if not recipe_ids:
+                return
+            placeholders = ', '.join('%s' for _ in recipe_ids)
+            cursor.execute(
+                f'DELETE FROM {SEARCH_TABLE} WHERE rowid IN ({placeholders})',
+                recipe_ids,
+            )
+            cursor.execute(
+                f'{SQLITE_INDEX_SQL} WHERE id IN ({placeholders})',
+                recipe_ids,
+            )
+
+
+def remove_from_index(recipe_id):
+    """Удаляет рецепт из отдельной поисковой таблицы SQLite."""
+    if connection.vendor == 'sqlite':
+        with connection.cursor() as cursor:
+            cursor.execute(
+                f'DELETE FROM {SEARCH_TABLE} WHERE rowid = %s',
+                (recipe_id,),
+            )
+
+
+def update_index(recipe_ids):
+    """Обновляет индекс рецептов, затем версию списка рецептов.
+
+    Версия меняется после индекса, иначе в кеш попал бы поиск
+    по старому индексу.
+    """
+    if recipe_ids:
+        index_recipes(recipe_ids)
+        bump_version(RECIPES_VERSION_KEY)
+
+
+def schedule_index(recipe_ids):
+    """Обновляет индекс после фиксации транзакции.
+
+    Ингредиенты рецепта сохраняются уже после самого рецепта,
+    поэтому индекс строится по зафиксированным данным. Рецепт,
+    сохраненный в транзакции несколько раз, индексируется один раз.
+    """
+    on_commit_once('search index', recipe_ids, update_index)
+
+
+def search_recipes(queryset, value):
+    """Оставляет найденные рецепты, сортируя их по релевантности."""
+    if connection.vendor == 'postgresql':
+        query = "websearch_to_tsquery('russian', %s)"
+        matches = RawSQL(
+            'SELECT id FROM recipes_recipe '
+            f'WHERE search_vector @@ {query}',
+            (value,),
+        )
+        rank = RawSQL(
+            f'ts_rank(recipes_recipe.search_vector, {query})',
+            (value,),
+            output_field=FloatField(),
+        )
+    else:
+        words = WORD_PATTERN.findall(value)
+        if not words:
+            return queryset.none()
+        query = ' '.join(f'"{word}"*' for word in words)
+        matches = RawSQL(
+            f'SELECT rowid FROM {SEARCH_TABLE} '
+            f'WHERE {SEARCH_TABLE} MATCH %s',
+            (query,),
+        )
+        rank = RawSQL(
+            f'SELECT {SQLITE_RANK_SQL} FROM {SEARCH_TABLE} '
+            f'WHERE {SEARCH_TABLE} MATCH %s '
+            f'AND rowid = recipes_recipe.id',
+            (query,),
+            output_field=FloatField(),
+        )
+    return queryset.filter(pk__in=matches).annotate(
+        search_rank=rank
+    ).order_by('-search_rank', '-pub_date', '-id')
@@ -0,0 +1,51 @@
+from django.db import connection
+
+
+def get_section_sql(model):
+    """Возвращает таблицу и колонки пользователя и рецепта раздела."""
+    quote = connection.ops.quote_name
+    return (
+        quote(model._meta.db_table),
+        quote(model._meta.get_field('user').column),
+        quote(model._meta.get_field('recipe').column),
+    )
+
+
+def insert_section_recipes(model, user_id, recipe_ids):
+    """Добавляет рецепты в раздел пользователя одним запросом.
+
+    Возвращает id действительно добавленных рецептов: записи, которые
+    уже есть или созданы параллельным запросом, база пропускает.
+    """
+    if not recipe_ids:
+        return set()
+    table, user_column, recipe_column = get_section_sql(model)
+    values = ', '.join('(%s, %s)' for _ in recipe_ids)
+    with connection.cursor() as cursor:
+        cursor.execute(
+            f'INSERT INTO {table} ({user_column}, {recipe_column}) '
+            f'VALUES {values} ON CONFLICT DO NOTHING '
+            f'RETURNING {recipe_column}',
+            [value for pk in recipe_ids for value in (user_id, pk)],
+        )
+        return {pk for pk, in cursor.fetchall()}
+
+
+def delete_section_recipes(model, user_id, recipe_ids):
+    """Удаляет рецепты из раздела пользователя одним запросом.
+
+    Возвращает id действительно удаленных рецептов. Сигналы удаления
+    не отправляются, счетчики рецептов обновляет вызывающий код.
+    """
+    if not recipe_ids:
+        return set()
+    table, user_column, recipe_column = get_section_sql(model)
+    placeholders = ', '.join('%s' for _ in recipe_ids)
+    with connection.cursor() as cursor:
+        cursor.execute(
+            f'DELETE FROM {table} WHERE {user_column} = %s '
+            f'AND {recipe_column} IN ({placeholders}) '
+            f'RETURNING {recipe_column}',
+            [user_id, *recipe_ids],
+        )
+        return {pk for pk, in cursor.fetchall()}
@@ -0,0 +1,194 @@
+from contextlib import contextmanager
+from contextvars import ContextVar
+
+from django.db.models.signals import m2m_changed, post_delete, post_save
+from django.dispatch import receiver
+
+from core.caches import (
+    CATALOG_VERSION_KEY,
+    RECIPES_VERSION_KEY,
+    get_recipe_version_key,
+    schedule_version_bump,
+)
+from core.counters import change_counter
+from recipes.feed import clear_feed, fan_out_recipes, fill_feed
+from recipes.models import (
+    Favorite,
+    Ingredient,
+    Recipe,
+    RecipeIngredient,
+    RecipeScore,
+    ShoppingCart,
+    Tag,
+)
+from recipes.renditions import schedule_renditions
+from recipes.search import remove_from_index, schedule_index
+from users.models import Follow, User
+
+RECIPE_COUNTERS = {
+    Favorite: 'favorites_count',
+    ShoppingCart: 'shopping_cart_count',
+}
+
+SEARCH_FIELDS = frozenset(('name', 'text'))
+
+SKIPPED_RECIPE_COUNTERS = ContextVar(
+    'skipped_recipe_counters', default=frozenset()
+)
+
+
+@contextmanager
+def skip_recipe_counters(recipe_ids):
+    """Отключает обновление счетчиков рецептов по каждой записи.
+
+    Используется, когда рецепт удаляется вместе со своими счетчиками.
+    """
+    token = SKIPPED_RECIPE_COUNTERS.set(
+        SKIPPED_RECIPE_COUNTERS.get() | frozenset(recipe_ids)
+    )
+    try:
+        yield
+    finally:
+        SKIPPED_RECIPE_COUNTERS.reset(token)
+
+
+@receiver(post_save, sender=Favorite)
+@receiver(post_save, sender=ShoppingCart)
+def increase_recipe_counter(sender, instance, created, raw, **kwargs):
+    """Увеличивает счетчик рецепта при добавлении в раздел."""
+    if created and not raw:
+        change_counter(
+            Recipe, RECIPE_COUNTERS[sender], 1, pk=instance.recipe_id
+        )
+
+
+@receiver(post_delete, sender=Favorite)
+@receiver(post_delete, sender=ShoppingCart)
+def decrease_recipe_counter(sender, instance, **kwargs):
+    """Уменьшает счетчик рецепта при удалении из раздела."""
+    if instance.recipe_id in SKIPPED_RECIPE_COUNTERS.get():
+        return
+    change_counter(
+        Recipe, RECIPE_COUNTERS[sender], -1, pk=instance.recipe_id
+    )
+
+
+@receiver(post_save, sender=Recipe)
+def increase_recipes_count(sender, instance, created, raw, **kwargs):
+    """Увеличивает количество рецептов автора."""
+    if created and not raw:
+        change_counter(User, 'recipes_count', 1, pk=instance.author_id)
+
+
+@receiver(post_save, sender=Recipe)
+def add_recipe_to_feeds(sender, instance, created, raw, **kwargs):
+    """Добавляет новый рецепт в ленты подписчиков автора."""
+    if created and not raw:
+        fan_out_recipes((instance,))
+
+
+@receiver(post_save, sender=Recipe)
+def create_recipe_score(sender, instance, created, raw, **kwargs):
+    """Создает рейтинг нового рецепта."""
+    if created and not raw:
+        RecipeScore.objects.create(recipe=instance)
+
+
+@receiver(post_save, sender=Follow)
+def add_author_to_feed(sender, instance, created, raw, **kwargs):
+    """Добавляет рецепты автора в ленту нового подписчика."""
+    if created and not raw:
+        fill_feed(instance.user_id, instance.following_id)
+
+
+@receiver(post_delete, sender=Follow)
+def remove_author_from_feed(sender, instance, **kwargs):
+    """Удаляет рецепты автора из ленты после отписки."""
+    clear_feed(instance.user_id, instance.following_id)
+
+
+@receiver(post_delete, sender=Recipe)
+def decrease_recipes_count(sender, instance, **kwargs):
+    """Уменьшает количество рецептов автора."""
+    change_counter(User, 'recipes_count', -1, pk=instance.author_id)
+
+
+@receiver((post_save, post_delete), sender=Tag)
+@receiver((post_save, post_delete), sender=Ingredient)
+def change_catalog_version(sender, **kwargs):
+    """Обновляет версию справочников при изменении тегов и ингредиентов."""
+    schedule_version_bump(CATALOG_VERSION_KEY)
+
+
+@receiver(post_save, sender=Recipe)
+def create_image_renditions(sender, instance, raw, **kwargs):
+    """Ставит в очередь создание копий новой картинки рецепта."""
+    if (
+        not raw and instance.image
+        and instance.image_renditions.get('source') != instance.image.name
+    ):
+        schedule_renditions(instance.pk)
+
+
+@receiver(post_save, sender=Recipe)
+def update_recipe_search_index(sender, instance, created, raw, update_fields,
+                               **kwargs):
+    """Обновляет поисковый индекс рецепта с новым названием или текстом."""
+    if not raw and (created or update_fields is None or (
+        SEARCH_FIELDS.intersection(update_fields)
+    )):
+        schedule_index((instance.pk,))
+
+
+@receiver(post_delete, sender=Recipe)
+def remove_recipe_search_index(sender, instance, **kwargs):
+    """Удаляет рецепт из поискового индекса."""
+    remove_from_index(instance.pk)
+
+
+@receiver(post_save, sender=Ingredient)
+def update_ingredient_search_index(sender, instance, created, raw,
+                                   **kwargs):
+    """Обновляет индекс рецептов с переименованным ингредиентом."""
+    if not created and not raw:
+        schedule_index(RecipeIngredient.objects.filter(
+            ingredient=instance
+        ).values_list('recipe_id', flat=True))
+
+
+@receiver(post_save, sender=Recipe)
+def change_recipe_version(sender, instance, **kwargs):
+    """Обновляет версию рецепта."""
+    schedule_version_bump(get_recipe_version_key(instance.pk))
+
+
+@receiver(post_delete, sender=Recipe)
+def change_recipes_version(sender, instance, **kwargs):
+    """Обновляет версии удаленного рецепта и списка рецептов."""
+    schedule_version_bump(
+        get_recipe_version_key(instance.pk), RECIPES_VERSION_KEY
+    )
+
+
+@receiver((post_save, post_delete), sender=RecipeIngredient)
+def change_recipe_ingredients_version(sender, instance, **kwargs):
+    """Обновляет версию и поисковый индекс рецепта с новыми ингредиентами."""
+    schedule_version_bump(get_recipe_version_key(instance.recipe_id))
+    schedule_index((instance.recipe_id,))
+
+
+@receiver(m2m_changed, sender=Recipe.tags.through)
+def change_recipe_tags_version(sender, instance, action, reverse, **kwargs):
+    """Обновляет версии рецепта и списка при изменении тегов.
+
+    Изменение рецептов со стороны тега затрагивает неизвестный набор
+    рецептов, поэтому обновляется версия справочников.
+    """
+    if action not in ('post_add', 'post_remove', 'post_clear'):
+        return
+    if reverse:
+        schedule_version_bump(CATALOG_VERSION_KEY)
+        return
+    schedule_version_bump(
+        get_recipe_version_key(instance.pk), RECIPES_VERSION_KEY
+    )
@@ -0,0 +1,60 @@
+from django.core.cache import cache
+from django.test import override_settings
+from rest_framework.authtoken.models import Token
+
+from core.caches import get_token_cache_key
+from recipes.models import Recipe
+from tests.utils import QueryCountTestCase
+from users.models import User
+
+LOCMEM_CACHES = {
+    'default': {
+        'BACKEND': 'django.core.cache.backends.locmem.LocMemCache',
+    },
+}
+
+
+@override_settings(CACHES=LOCMEM_CACHES)
+class CachedTokenAuthenticationTest(QueryCountTestCase):
+    """Авторизация по токену из кеша."""
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.user = User.objects.create_user(
+            username='author',
+            email='author@foodgram.ru',
+            first_name='Автор',
+            last_name='Рецептов',
+            password='password',
+        )
+
+    def setUp(self):
+        cache.clear()
+        self.client = self.get_client(self.user)
+        self.token = Token.objects.get(user=self.user).key
+
+    def test_set_password_with_cached_user_keeps_counters(self):
+        response = self.client.get('/api/users/me/')
+        self.assertEqual(response.status_code, 200, response.data)
+        self.assertIsNotNone(cache.get(get_token_cache_key(self.token)))
+        recipe = Recipe.objects.create(
+            author=self.user,
+            name='Рецепт',
+            text='Описание',
+            cooking_time=10,
+            image='recipes/images/recipe.gif',
+        )
+        with self.captureOnCommitCallbacks(execute=True):
+            response = self.client.post('/api/users/set_password/', {
+                'current_password': 'password',
+                'new_password': 'new-Password-123',
+            })
+        self.assertEqual(response.status_code, 204, response.data)
+        self.assertIsNone(cache.get(get_token_cache_key(self.token)))
+        self.user.refresh_from_db()
+        self.assertEqual(self.user.recipes_count, 1)
+        self.assertTrue(self.user.check_password('new-Password-123'))
+        response = self.client.delete(f'/api/recipes/{recipe.pk}/')
+        self.assertEqual(response.status_code, 204)
+        self.user.refresh_from_db()
+        self.assertEqual(self.user.recipes_count, 0)
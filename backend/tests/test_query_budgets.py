@@ -0,0 +1,104 @@
+from io import StringIO
+
+from django.core.management import call_command
+from django.db import connection, transaction
+from django.test.utils import CaptureQueriesContext
+
+from core.benchmark import get_context, get_scenarios
+from tests.utils import QueryCountTestCase
+
+# Наборы данных создаются по очереди в одной тестовой базе, второй
+# дополняет первый. Первый набор плотный, чтобы у пользователя замера
+# были подписки, избранное и список покупок, но рецептов в нем меньше
+# страницы, поэтому лишний запрос на строку меняет число запросов.
+DATASET_SIZES = (
+    {'users': 5, 'recipes': 5, 'favorites': 8, 'carts': 8, 'follows': 8},
+    {
+        'users': 60,
+        'recipes': 400,
+        'favorites': 800,
+        'carts': 300,
+        'follows': 400,
+    },
+)
+
+# Допустимое число SQL запросов на запрос к эндпоинту без кеша.
+# Точки сохранения транзакций и запрос токена авторизации учитываются.
+QUERY_BUDGETS = {
+    'recipes_list_anonymous': 4,
+    'recipes_list': 6,
+    'recipes_list_cursor': 5,
+    'recipes_list_tags': 7,
+    'recipes_search': 6,
+    'recipes_popular': 6,
+    'recipes_trending': 6,
+    'recipes_feed': 7,
+    'recipe_detail': 5,
+    'recipe_create': 18,
+    'recipe_update': 17,
+    'recipe_delete': 16,
+    'favorite_add': 6,
+    'favorite_remove': 4,
+    'favorite_batch': 6,
+    'shopping_cart_add': 6,
+    'shopping_cart_remove': 4,
+    'download_shopping_cart': 2,
+    'users_list': 4,
+    'user_detail': 3,
+    'users_me': 1,
+    'subscriptions': 5,
+    'subscribe': 10,
+    'unsubscribe': 5,
+    'tags_list': 1,
+    'ingredients_search': 1,
+    'ingredient_detail': 1,
+}
+
+
+class QueryBudgetTest(QueryCountTestCase):
+    """Число SQL запросов эндпоинтов не зависит от размера данных."""
+
+    def run_scenarios(self):
+        """Выполняет сценарии и возвращает их SQL запросы по именам.
+
+        Каждый запрос выполняется в транзакции, которая откатывается,
+        поэтому сценарии видят одни и те же данные.
+        """
+        context = get_context()
+        clients = {False: self.get_client(), True: self.get_client(
+            context['user']
+        )}
+        results = {}
+        for name, method, url, data, authenticated in get_scenarios(context):
+            with transaction.atomic():
+                with CaptureQueriesContext(connection) as queries:
+                    response = getattr(clients[authenticated], method)(
+                        url, data, format='json'
+                    )
+                    if response.streaming:
+                        b''.join(response.streaming_content)
+                transaction.set_rollback(True)
+            self.assertLess(response.status_code, 400, f'{name}: {url}')
+            results[name] = [query['sql'] for query in queries]
+        return results
+
+    def test_query_budgets(self):
+        runs = []
+        for seed, size in enumerate(DATASET_SIZES):
+            call_command(
+                'generate_dataset', seed=seed, stdout=StringIO(), **size
+            )
+            runs.append(self.run_scenarios())
+        small, large = runs
+        for name, queries in large.items():
+            with self.subTest(endpoint=name):
+                sql = '\n'.join(queries)
+                self.assertIn(name, QUERY_BUDGETS, f'Бюджет не задан:\n{sql}')
+                self.assertLessEqual(
+                    len(queries), QUERY_BUDGETS[name],
+                    f'Превышен бюджет {name}:\n{sql}',
+                )
+                self.assertEqual(
+                    len(small.get(name, ())), len(queries),
+                    f'Число запросов {name} зависит от данных:\n{sql}',
+                )
@@ -0,0 +1,124 @@
+from unittest import mock
+
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+
+from recipes.models import Ingredient, Recipe, Tag
+from tests.utils import QueryCountTestCase
+from users.models import User
+
+IMAGE = (
+    'data:image/gif;base64,R0lGODlhAQABAIAAAP///wAAACH5BAEAAAAALAAAAAABAAEA'
+    'AAICRAEAOw=='
+)
+
+
+class RecipeWriteTest(QueryCountTestCase):
+    """Создание рецепта."""
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.user = User.objects.create_user(
+            username='author',
+            email='author@foodgram.ru',
+            first_name='Автор',
+            last_name='Рецептов',
+            password='password',
+        )
+        cls.tags = [
+            Tag.objects.create(
+                name=f'Тег {index}', color=f'#00000{index}', slug=f'tag{index}'
+            )
+            for index in range(3)
+        ]
+        cls.ingredients = [
+            Ingredient.objects.create(
+                name=f'Ингредиент {index}', measurement_unit='г'
+            )
+            for index in range(30)
+        ]
+
+    def create_recipe(self, ingredients):
+        """Создает рецепт и возвращает выполненные SQL запросы."""
+        client = self.get_client(self.user)
+        with CaptureQueriesContext(connection) as queries:
+            response = client.post('/api/recipes/', {
+                'name': f'Рецепт из {len(ingredients)} ингредиентов',
+                'text': 'Описание',
+                'cooking_time': 10,
+                'image': IMAGE,
+                'tags': [tag.pk for tag in self.tags],
+                'ingredients': [
+                    {'id': ingredient.pk, 'amount': amount}
+                    for amount, ingredient in enumerate(ingredients, start=1)
+                ],
+            }, format='json')
+        self.assertEqual(response.status_code, 201, response.data)
+        return [query['sql'] for query in queries]
+
+    def test_create_queries_do_not_depend_on_ingredients(self):
+        few = self.create_recipe(self.ingredients[:2])
+        many = self.create_recipe(self.ingredients)
+        self.assertEqual(len(few), len(many), '\n'.join(many))
+        self.assertEqual(
+            Recipe.objects.get(
+                name='Рецепт из 30 ингредиентов'
+            ).recipe_ingredient.count(),
+            30,
+        )
+
+    def test_create_schedules_renditions_once(self):
+        with mock.patch('recipes.renditions.executor') as executor:
+            with self.captureOnCommitCallbacks(execute=True):
+                self.create_recipe(self.ingredients[:2])
+        executor.submit.assert_called_once()
+
+    def test_create_updates_search_index_once(self):
+        with mock.patch('recipes.renditions.executor'), mock.patch(
+            'recipes.search.index_recipes'
+        ) as index_recipes:
+            with self.captureOnCommitCallbacks(execute=True):
+                self.create_recipe(self.ingredients[:2])
+        index_recipes.assert_called_once()
+
+
+class CounterFieldsTest(QueryCountTestCase):
+    """Сохранение устаревших экземпляров не затирает счетчики."""
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.user = User.objects.create_user(
+            username='author',
+            email='author@foodgram.ru',
+            first_name='Автор',
+            last_name='Рецептов',
+            password='password',
+        )
+
+    def test_full_save_keeps_counters(self):
+        client = self.get_client(self.user)
+        response = client.post('/api/recipes/', {
+            'name': 'Рецепт',
+            'text': 'Описание',
+            'cooking_time': 10,
+            'image': IMAGE,
+            'tags': [],
+            'ingredients': [],
+        }, format='json')
+        self.assertEqual(response.status_code, 201, response.data)
+        recipe = Recipe.objects.get(pk=response.data['id'])
+        response = client.post(f'/api/recipes/{recipe.pk}/favorite/')
+        self.assertEqual(response.status_code, 201, response.data)
+        self.user.set_password('new_password')
+        self.user.save()
+        recipe.name = 'Новое название'
+        recipe.save()
+        self.user.refresh_from_db()
+        recipe.refresh_from_db()
+        self.assertEqual(self.user.recipes_count, 1)
+        self.assertEqual(recipe.favorites_count, 1)
+        self.assertEqual(recipe.name, 'Новое название')
+        response = client.delete(f'/api/recipes/{recipe.pk}/')
+        self.assertEqual(response.status_code, 204)
+        self.user.refresh_from_db()
+        self.assertEqual(self.user.recipes_count, 0)
@@ -0,0 +1,95 @@
+from recipes.models import Favorite, Recipe, ShoppingCart
+from recipes.signals import RECIPE_COUNTERS
+from tests.utils import QueryCountTestCase
+from users.models import Follow, User
+
+
+class SectionTest(QueryCountTestCase):
+    """Добавление и удаление избранного, списка покупок и подписок."""
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.user, cls.author = (
+            User.objects.create_user(
+                username=username,
+                email=f'{username}@foodgram.ru',
+                first_name='Имя',
+                last_name='Фамилия',
+                password='password',
+            )
+            for username in ('user', 'author')
+        )
+        cls.recipe = Recipe.objects.create(
+            author=cls.author,
+            name='Рецепт',
+            text='Описание',
+            cooking_time=10,
+            image='recipes/images/recipe.gif',
+        )
+
+    def setUp(self):
+        self.client = self.get_client(self.user)
+
+    def assert_request(self, method, url, status_code, queries):
+        """Проверяет код ответа и число SQL запросов обращения."""
+        with self.assertNumQueries(queries):
+            response = getattr(self.client, method)(url)
+        self.assertEqual(response.status_code, status_code, response.data)
+
+    def test_recipe_sections(self):
+        for model, section in (
+            (Favorite, 'favorite'),
+            (ShoppingCart, 'shopping_cart'),
+        ):
+            url = f'/api/recipes/{self.recipe.pk}/{section}/'
+            with self.subTest(section=section):
+                self.assert_request('post', url, 201, 6)
+                self.assert_request('post', url, 400, 6)
+                self.recipe.refresh_from_db()
+                self.assertEqual(
+                    getattr(self.recipe, RECIPE_COUNTERS[model]), 1
+                )
+                self.assert_request('delete', url, 204, 4)
+                self.assert_request('delete', url, 400, 2)
+                self.recipe.refresh_from_db()
+                self.assertEqual(
+                    getattr(self.recipe, RECIPE_COUNTERS[model]), 0
+                )
+                self.assertFalse(model.objects.exists())
+
+    def test_batch_ignores_duplicate_ids(self):
+        missing = self.recipe.pk + 1
+        for method, statuses in (
+            ('post', ['added', 'not_found']),
+            ('delete', ['removed', 'not_found']),
+        ):
+            with self.subTest(method=method):
+                response = getattr(self.client, method)(
+                    '/api/recipes/favorite/batch/',
+                    {'recipes': [self.recipe.pk, missing, self.recipe.pk]},
+                    format='json',
+                )
+                self.assertEqual(response.status_code, 200, response.data)
+                self.assertEqual(
+                    response.data['results'],
+                    [
+                        {'id': pk, 'status': status}
+                        for pk, status in zip(
+                            (self.recipe.pk, missing), statuses
+                        )
+                    ],
+                )
+        self.recipe.refresh_from_db()
+        self.assertEqual(self.recipe.favorites_count, 0)
+
+    def test_subscribe(self):
+        url = f'/api/users/{self.author.pk}/subscribe/'
+        self.assert_request('post', url, 201, 10)
+        self.assert_request('post', url, 400, 6)
+        self.author.refresh_from_db()
+        self.assertEqual(self.author.followers_count, 1)
+        self.assert_request('delete', url, 204, 5)
+        self.assert_request('delete', url, 400, 2)
+        self.author.refresh_from_db()
+        self.assertEqual(self.author.followers_count, 0)
+        self.assertFalse(Follow.objects.exists())
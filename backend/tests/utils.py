@@ -0,0 +1,47 @@
+import shutil
+import tempfile
+
+from django.test import TestCase, override_settings
+from rest_framework.authtoken.models import Token
+from rest_framework.test import APIClient
+
+DUMMY_CACHES = {
+    'default': {
+        'BACKEND': 'django.core.cache.backends.dummy.DummyCache',
+    },
+}
+
+
+class QueryCountTestCase(TestCase):
+    """Базовый тест числа SQL запросов.
+
+    Кеш отключен, чтобы считались запросы к базе каждого обращения,
+    а не попадания в кеш. Картинки рецептов сохраняются во временный
+    каталог.
+    """
+
+    @classmethod
+    def setUpClass(cls):
+        cls.media_root = tempfile.mkdtemp()
+        cls.settings_override = override_settings(
+            ALLOWED_HOSTS=['testserver'],
+            CACHES=DUMMY_CACHES,
+            MEDIA_ROOT=cls.media_root,
+        )
+        cls.settings_override.enable()
+        super().setUpClass()
+
+    @classmethod
+    def tearDownClass(cls):
+        super().tearDownClass()
+        cls.settings_override.disable()
+        shutil.rmtree(cls.media_root, ignore_errors=True)
+
+    @staticmethod
+    def get_client(user=None):
+        """Возвращает клиент API, авторизованный токеном пользователя."""
+        client = APIClient()
+        if user is not None:
+            token, _ = Token.objects.get_or_create(user=user)
+            client.credentials(HTTP_AUTHORIZATION=f'Token {token.key}')
+        return client
@@ -44,12 +44,12 @@ class UserAdmin(BaseUserAdmin):
     @admin.display(description='Рецепты')
     def recipe_count(self, obj):
         """Возвращает количество рецептов пользователя."""
-        return obj.recipes.count()
+        return obj.recipes_count
 
     @admin.display(description='Подписки')
     def following_count(self, obj):
         """Возвращает количество подписок пользователя."""
-        return obj.following.count()
+        return obj.followers_count
 
 
 @admin.register(Follow)
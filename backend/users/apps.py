@@ -7,3 +7,7 @@ class UsersConfig(AppConfig):
     default_auto_field = 'django.db.models.BigAutoField'
     name = 'users'
     verbose_name = 'Пользователи'
+
+    def ready(self):
+        """Подключает обработчики сигналов счетчиков."""
+        from users import signals  # noqa: F401
@@ -2,10 +2,11 @@ from django.db import models
 from django.contrib.auth.models import AbstractUser
 
 from core.consts import LENGTH_USER_CHARFIELD, LENGTH_USER_EMAILFIELD
+from core.models import CounterFieldsModel
 from core.validators import username_validator
 
 
-class User(AbstractUser):
+class User(CounterFieldsModel, AbstractUser):
     """Модель переопределенного класса User."""
 
     USERNAME_FIELD = 'email'
@@ -34,6 +35,18 @@ class User(AbstractUser):
         'Фамилия',
         max_length=LENGTH_USER_CHARFIELD,
     )
+    recipes_count = models.PositiveIntegerField(
+        'Количество рецептов',
+        default=0,
+        editable=False,
+    )
+    followers_count = models.PositiveIntegerField(
+        'Количество подписчиков',
+        default=0,
+        editable=False,
+    )
+
+    counter_fields = ('recipes_count', 'followers_count')
 
     class Meta:
         verbose_name = 'пользователь'
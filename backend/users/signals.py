@@ -0,0 +1,45 @@
+from django.db.models.signals import post_delete, post_save
+from django.dispatch import receiver
+from rest_framework.authtoken.models import Token
+
+from core.authentication import clear_token_cache
+from core.caches import get_user_version_key, schedule_version_bump
+from core.counters import change_counter
+from users.models import Follow, User
+
+
+@receiver(post_save, sender=Follow)
+def increase_followers_count(sender, instance, created, raw, **kwargs):
+    """Увеличивает количество подписчиков автора."""
+    if created and not raw:
+        change_counter(
+            User, 'followers_count', 1, pk=instance.following_id
+        )
+
+
+@receiver(post_delete, sender=Follow)
+def decrease_followers_count(sender, instance, **kwargs):
+    """Уменьшает количество подписчиков автора."""
+    change_counter(User, 'followers_count', -1, pk=instance.following_id)
+
+
+@receiver((post_save, post_delete), sender=User)
+def change_user_version(sender, instance, **kwargs):
+    """Обновляет версию пользователя при изменении его данных."""
+    schedule_version_bump(get_user_version_key(instance.pk))
+
+
+@receiver((post_save, post_delete), sender=User)
+def clear_user_token_cache(sender, instance, **kwargs):
+    """Сбрасывает кеш авторизации после смены пароля или деактивации.
+
+    Кеш сбрасывается при любом сохранении, иначе request.user
+    содержал бы устаревшие данные пользователя.
+    """
+    clear_token_cache(instance.pk)
+
+
+@receiver(post_delete, sender=Token)
+def clear_deleted_token_cache(sender, instance, **kwargs):
+    """Сбрасывает кеш удаленного при выходе токена."""
+    clear_token_cache(instance.user_id, instance.key)